@@ -12,17 +12,20 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-import dj_database_url
 
 from decimal import Decimal
 
-# Load environment variables
-load_dotenv()
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from a local .env file, if there is one.
+# Deployed environments set them directly, so dotenv is not imported there.
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
@@ -39,26 +42,41 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'filipino-food-store.herokuapp.com']
 
 # Application definition
 
+# Admin-only apps can be left out of storefront-only processes.
+ADMIN_ENABLED = os.environ.get('ADMIN_ENABLED', 'True') == 'True'
+
+# Cloudinary is only used when its credentials are configured.
+CLOUDINARY_ENABLED = 'CLOUDINARY_CLOUD_NAME' in os.environ
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'django_summernote',
     'widget_tweaks',
     'mathfilters',
     'store',
-    'cloudinary',
 ]
 
+if ADMIN_ENABLED:
+    # SimpleAdminConfig skips autodiscovery during app loading; admin
+    # modules are imported when the URLconf is first loaded instead.
+    INSTALLED_APPS = ['django.contrib.admin.apps.SimpleAdminConfig'] + \
+        INSTALLED_APPS + ['django_summernote']
+
+if CLOUDINARY_ENABLED:
+    INSTALLED_APPS += ['cloudinary']
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'store.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    # Inside CsrfViewMiddleware, to see whether the CSRF token was used.
+    'store.middleware.CompressionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -66,19 +84,29 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'food_store.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    # Collapses indentation of the store's templates as they are loaded.
+    'store.loaders.Loader',
+]
+if not DEBUG:
+    # Compile each template once per process instead of on every render.
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader',
+                         TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'store.context_processors.store_settings',
-                'store.context_processors.cart',
+                'store.context_processors.catalog',
             ],
         },
     },
@@ -90,7 +118,60 @@ WSGI_APPLICATION = 'food_store.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
-DEFAULT_DATABASE_CONFIG = dj_database_url.config()
+# Persistent connections: keep each worker's connection open for this many
+# seconds instead of reconnecting (and renegotiating TLS) on every request.
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '600'))
+# Optional in-process connection pool. It needs Django 5.1+ with
+# psycopg[pool], so it is refused on the pinned Django 4.2 and psycopg2;
+# pool there with an external pooler such as PgBouncer instead. Leave
+# unset to rely on persistent connections alone.
+DATABASE_POOL_MIN_SIZE = int(os.environ.get('DATABASE_POOL_MIN_SIZE', '0'))
+DATABASE_POOL_MAX_SIZE = int(os.environ.get('DATABASE_POOL_MAX_SIZE', '0'))
+
+
+def database_pool_supported() -> bool:
+    """
+    Whether Django's own connection pool is available: Django 5.1+ with
+    psycopg 3 and psycopg_pool installed.
+    """
+    import django
+    if django.VERSION < (5, 1):
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def database_config(url):
+    """
+    Builds a production database profile from a database URL.
+    """
+    if not url:
+        return {}
+    import dj_database_url
+    config = dj_database_url.parse(url, conn_max_age=DATABASE_CONN_MAX_AGE)
+    # Verify a reused connection before the first query of each request,
+    # so one dropped by a database restart or failover is replaced instead
+    # of failing the request (Django 4.1+).
+    config['CONN_HEALTH_CHECKS'] = True
+    if DATABASE_POOL_MAX_SIZE > 0 and 'postgresql' in config['ENGINE']:
+        if not database_pool_supported():
+            raise ImproperlyConfigured(
+                'DATABASE_POOL_MAX_SIZE needs Django 5.1+ with psycopg[pool]. '
+                'Unset it, or pool connections with an external pooler such '
+                'as PgBouncer.')
+        # Pooling and persistent connections are mutually exclusive.
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+        }
+    return config
+
+
+DEFAULT_DATABASE_CONFIG = database_config(os.environ.get('DATABASE_URL'))
 DATABASES = {
     # Use the DATABASE_URL env var if available.
     # sqlite3 will be fallback.
@@ -101,6 +182,68 @@ DATABASES = {
     }
 }
 
+# Optional read replicas of the default database, as comma-separated
+# database URLs. Catalog pages read from a random replica; see
+# store.routers.
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.environ.get(
+        'DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES['replica_%d' % number] = {**database_config(url.strip()),
+                                        'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append('replica_%d' % number)
+
+DATABASE_ROUTERS = ['store.routers.PrimaryReplicaRouter']
+
+# Seconds during which a client that wrote keeps reading from the primary,
+# so it sees its own writes despite replication lag.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    # Per-process memory cache unless a shared Redis instance is configured.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if 'REDIS_URL' in os.environ else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Lifetime of cached template fragments. Catalog changes invalidate them
+# immediately through the catalog version; the timeout bounds staleness
+# when every worker keeps its own memory cache.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '300'))
+
+
+# Request budgets per throttling scope, as '<requests>/<s|m|h|d>', counted
+# per client IP (per customer for wishlist changes) in THROTTLE_CACHE.
+# With the per-process memory cache, each worker counts separately.
+THROTTLE_RATES = {
+    'search': os.environ.get('THROTTLE_SEARCH_RATE', '30/m'),
+    'product': os.environ.get('THROTTLE_PRODUCT_RATE', '120/m'),
+    'cart': os.environ.get('THROTTLE_CART_RATE', '60/m'),
+    'wishlist': os.environ.get('THROTTLE_WISHLIST_RATE', '30/m'),
+}
+THROTTLE_CACHE = 'default'
+# Number of reverse proxies in front of the app, whose X-Forwarded-For
+# entries identify clients instead of REMOTE_ADDR. Defaults to 1 for the
+# Heroku router; set it to 0 where clients connect directly, or they can
+# pick their own address.
+THROTTLE_PROXY_COUNT = int(os.environ.get('THROTTLE_PROXY_COUNT', '1'))
+
+
+# Brotli compression level (0-11) of responses, when the brotli package is
+# installed. Mid levels compress close to gzip speed, much smaller.
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+
+
+# Lifetime of publicly cacheable catalog pages in shared caches (CDN,
+# reverse proxy). Per-visitor parts are loaded from a separate endpoint.
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -149,16 +292,22 @@ STATIC_ROOT = os.environ.get('STATIC_ROOT', BASE_DIR / 'static/')
 
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media/')
 MEDIA_URL = os.environ.get('MEDIA_URL', 'media/')
+DEFAULT_FILE_STORAGE = 'store.storage.LocalMediaStorage'
+# Number of media URLs each process remembers; see store.storage.
+MEDIA_URL_CACHE_SIZE = int(os.environ.get('MEDIA_URL_CACHE_SIZE', '10000'))
 
 
 # Cloudinary file storage
-
-CLOUDINARY_STORAGE = {
-    'CLOUD_NAME': os.environ['CLOUDINARY_CLOUD_NAME'],
-    'API_KEY': os.environ['CLOUDINARY_API_KEY'],
-    'API_SECRET': os.environ['CLOUDINARY_API_SECRET'],
-}
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# Without credentials (local development, tests), media is stored under
+# MEDIA_ROOT and the Cloudinary stack is never imported.
+
+if CLOUDINARY_ENABLED:
+    CLOUDINARY_STORAGE = {
+        'CLOUD_NAME': os.environ['CLOUDINARY_CLOUD_NAME'],
+        'API_KEY': os.environ['CLOUDINARY_API_KEY'],
+        'API_SECRET': os.environ['CLOUDINARY_API_SECRET'],
+    }
+    DEFAULT_FILE_STORAGE = 'store.cloudinary_media.CloudinaryMediaStorage'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
@@ -168,3 +317,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Project-related settings
 
 DELIVERY_FEE = Decimal(os.environ.get('DELIVERY_FEE', '49.99'))
+
+# Age in days after which finished orders are moved to the archive tables
+# by the archive_orders command.
+ORDER_ARCHIVE_DAYS = int(os.environ.get('ORDER_ARCHIVE_DAYS', '365'))
@@ -13,7 +13,6 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
@@ -21,10 +20,18 @@ from django.urls import path, include
 
 
 urlpatterns = [
-    path('summernote/', include('django_summernote.urls')),
-    path('admin/', admin.site.urls),
     path('', include('store.urls')),
 ]
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    # Admin modules are discovered here rather than at app loading.
+    admin.autodiscover()
+    urlpatterns = [
+        path('summernote/', include('django_summernote.urls')),
+        path('admin/', admin.site.urls),
+    ] + urlpatterns
+
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
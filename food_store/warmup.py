@@ -0,0 +1,47 @@
+"""
+Warms per-process caches before gunicorn forks its workers.
+
+With preload_app, the master imports the application once. Loading the
+URLconf and compiling every store template there means forked workers
+share those objects copy-on-write instead of each building them on their
+first requests.
+
+Warming up is best effort: a failure is logged and the workers build
+what is missing on demand, so it never keeps the server from starting.
+"""
+
+import gc
+import logging
+from pathlib import Path
+
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    # Import the URLconf (and with it the admin modules) and populate the
+    # resolver's reverse lookup tables.
+    try:
+        get_resolver().reverse_dict
+        reverse('store:index')
+    except Exception:
+        logger.exception('Could not warm up the URLconf.')
+
+    # Compile the storefront templates into the cached template loader.
+    # Admin templates are left out: they need the admin, which
+    # storefront-only processes (ADMIN_ENABLED=False) do not install.
+    templates_dir = Path(__file__).resolve().parent.parent / 'store' / 'templates'
+    for template_path in sorted((templates_dir / 'store').rglob('*.html')):
+        template_name = template_path.relative_to(templates_dir).as_posix()
+        try:
+            get_template(template_name)
+        except Exception:
+            logger.exception('Could not warm up template %s.', template_name)
+
+    # Move everything allocated so far out of the garbage collector's
+    # generations, so collections in the workers do not touch (and copy)
+    # the shared pages.
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for the food_store web process.
+
+Gunicorn picks this file up automatically from the working directory.
+Every value can be overridden through the environment, e.g. on Heroku:
+
+    heroku config:set WEB_CONCURRENCY=3 GUNICORN_THREADS=4
+"""
+
+import multiprocessing
+import os
+
+# Workers and threads. Each thread keeps its own persistent database
+# connection (see DATABASE_CONN_MAX_AGE), so the number of open database
+# connections is workers * threads.
+workers = int(os.environ.get('WEB_CONCURRENCY',
+                             multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '2'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Load the Django application once in the master and fork workers from it.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Recycle workers periodically to bound memory growth. The jitter keeps
+# workers from restarting all at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+
+def when_ready(server):
+    """
+    Runs in the master once the application is preloaded, right before
+    the first workers are forked.
+    """
+    if preload_app:
+        from food_store.warmup import warm_up
+        warm_up()
+
+
+def pre_fork(server, worker):
+    """
+    Never let forked workers share a database connection opened by the
+    master while preloading the application.
+    """
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
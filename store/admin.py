@@ -1,11 +1,17 @@
 from django.conf import settings
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
 
 from django.db.models import Count
 
 from django_summernote import admin as summernote_admin
 
-from .models import Category, Product, Location, Inventory, Order, OrderItem, ProductImage, WishlistItem
+from . import bulk
+from .fulfillment import transition_orders
+from .sales import order_dates, rollup_days, sales_dashboard
+from .forms import PriceChangeForm, StockAdjustmentForm
+from .models import ArchivedOrder, ArchivedOrderItem, BulkChange, Category, DailySales, Product, Location, Inventory, Order, OrderItem, ProductImage, StockAlert, WishlistItem
 
 # Register your models here.
 
@@ -49,12 +55,73 @@ class ProductAdmin(summernote_admin.SummernoteModelAdmin):
     summernote_fields = ('body',)
     prepopulated_fields = {'stock_keeping_unit': ['title', ]}
     inlines = (ProductImageInline, InventoryProductInline,)
+    actions = ('enable_products', 'disable_products', 'change_prices',
+               'adjust_stock',)
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.prefetch_related('inventory_set', 'productimage_set') \
                        .annotate(num_images=Count('productimage'))
 
+    @admin.action(description='Enable selected products')
+    def enable_products(self, request, queryset):
+        change = bulk.set_products_enabled(queryset, True, request.user)
+        self.message_user(request, 'Enabled %d products.' % change.row_count)
+
+    @admin.action(description='Disable selected products')
+    def disable_products(self, request, queryset):
+        change = bulk.set_products_enabled(queryset, False, request.user)
+        self.message_user(request, 'Disabled %d products.' % change.row_count)
+
+    @admin.action(description='Change prices of selected products')
+    def change_prices(self, request, queryset):
+        form = self.bulk_change_form(request, PriceChangeForm)
+        if form.is_valid():
+            change = bulk.change_prices(queryset, form.cleaned_data['percentage'],
+                                        request.user)
+            self.message_user(request, 'Changed the prices of %d products.'
+                              % change.row_count)
+            return None
+        return self.bulk_change_response(request, queryset, form,
+                                         'Change prices')
+
+    @admin.action(description='Adjust stock of selected products')
+    def adjust_stock(self, request, queryset):
+        form = self.bulk_change_form(request, StockAdjustmentForm)
+        if form.is_valid():
+            change = bulk.adjust_stock(queryset, form.cleaned_data['location'],
+                                       form.cleaned_data['units'], request.user)
+            self.message_user(request, 'Adjusted %d inventories.'
+                              % change.row_count)
+            return None
+        return self.bulk_change_response(request, queryset, form,
+                                         'Adjust stock')
+
+    def bulk_change_form(self, request, form_class):
+        # The action is submitted twice: from the change list, then from
+        # the intermediate page with the form filled in.
+        if 'apply' in request.POST:
+            return form_class(request.POST)
+        return form_class()
+
+    def bulk_change_response(self, request, queryset, form, title):
+        if form.is_bound:
+            self.message_user(request, 'Please correct the errors below.',
+                              messages.ERROR)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'action': request.POST['action'],
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            'num_selected': queryset.count(),
+        }
+        return TemplateResponse(request, 'admin/store/product/bulk_change.html',
+                                context)
+
     @admin.display
     def image(self, object):
         from django.utils.html import mark_safe
@@ -65,6 +132,77 @@ class ProductAdmin(summernote_admin.SummernoteModelAdmin):
                          '/static/store/img/placeholder-200x200.jpg')
 
 
+@admin.register(BulkChange)
+class BulkChangeAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'changed_by', 'action', 'parameters',
+                    'row_count',)
+    list_filter = ('action',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'product', 'location', 'units_in_stock',
+                    'reorder_level', 'resolved_at',)
+    list_filter = (('resolved_at', admin.EmptyFieldListFilter),
+                   'inventory__location',)
+    search_fields = ('inventory__product__title',
+                     'inventory__product__stock_keeping_unit',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request) \
+                      .select_related('inventory__product',
+                                      'inventory__location')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(ordering='inventory__product__title')
+    def product(self, object):
+        return object.inventory.product.title
+
+    @admin.display(ordering='inventory__location__name')
+    def location(self, object):
+        return object.inventory.location.name
+
+
+@admin.register(DailySales)
+class SalesDashboardAdmin(admin.ModelAdmin):
+    """
+    Shows the sales of the last twelve months, read from the daily rollups
+    instead of the orders. Run refresh_sales_rollups to update them.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Sales dashboard',
+            'opts': self.model._meta,
+            **sales_dashboard(months=12),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request,
+                                'admin/store/dailysales/dashboard.html',
+                                context)
+
+
 @admin.register(WishlistItem)
 class WishlistItemAdmin(admin.ModelAdmin):
     list_display = ('wished_by', 'product__title')
@@ -104,6 +242,58 @@ class OrderAdmin(admin.ModelAdmin):
                                           'shipping_zip', 'shipping_phone',)}),
                  ('Delivery', {'fields': ('delivery_fee',)}))
     inlines = (OrderItemOrderInline,)
+    actions = ('mark_processing', 'mark_delivering', 'mark_done',
+               'cancel_orders', 'deny_orders',)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Existing orders change status through the actions only, so stock
+        # is restored and invalid transitions are refused.
+        if obj is not None:
+            return ('status',)
+        return ()
+
+    @admin.action(description='Mark selected orders as processing')
+    def mark_processing(self, request, queryset):
+        self.transition(request, queryset, 'PR')
+
+    @admin.action(description='Mark selected orders as delivering')
+    def mark_delivering(self, request, queryset):
+        self.transition(request, queryset, 'DL')
+
+    @admin.action(description='Mark selected orders as done')
+    def mark_done(self, request, queryset):
+        self.transition(request, queryset, 'DN')
+
+    @admin.action(description='Cancel selected orders and restock')
+    def cancel_orders(self, request, queryset):
+        self.transition(request, queryset, 'CN')
+
+    @admin.action(description='Deny selected orders and restock')
+    def deny_orders(self, request, queryset):
+        self.transition(request, queryset, 'DE')
+
+    def transition(self, request, queryset, status):
+        num_selected = queryset.count()
+        num_changed = transition_orders(queryset, status)
+        label = dict(Order._meta.get_field('status').choices)[status]
+        self.message_user(request, 'Changed %d orders to %s.'
+                          % (num_changed, label))
+        if num_changed < num_selected:
+            self.message_user(request, 'Skipped %d orders that cannot become %s.'
+                              % (num_selected - num_changed, label),
+                              messages.WARNING)
+
+    def delete_model(self, request, obj):
+        # Deletions leave no updated_at for the next refresh to find, so
+        # the rollups of the orders' days are recomputed right away.
+        dates = order_dates(Order.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        rollup_days(dates)
+
+    def delete_queryset(self, request, queryset):
+        dates = order_dates(queryset)
+        super().delete_queryset(request, queryset)
+        rollup_days(dates)
 
     def get_queryset(self, request):
         queryset = super(OrderAdmin, self).get_queryset(request)
@@ -118,3 +308,41 @@ class OrderAdmin(admin.ModelAdmin):
     @admin.display(ordering='placed_by__last_name')
     def placed_by(self, object):
         return object.placed_by.last_name + ', ' + object.placed_by.first_name
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'placed_by', 'status', 'created_at', 'archived_at',)
+    list_filter = ('status',)
+    search_fields = ('id',)
+    date_hierarchy = 'created_at'
+    fieldsets = OrderAdmin.fieldsets + (('History', {'fields': ('created_at',
+                                                                'updated_at',
+                                                                'archived_at',)}),)
+    inlines = (ArchivedOrderItemInline,)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('placed_by')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
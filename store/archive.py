@@ -0,0 +1,54 @@
+"""
+Archival of finished orders.
+
+Done, cancelled and denied orders older than settings.ORDER_ARCHIVE_DAYS
+are moved with their line items from Order and OrderItem to ArchivedOrder
+and ArchivedOrderItem, one batch per transaction. Archived rows leave the
+live tables, so a run can be interrupted and resumed at any point.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+FINISHED_STATUSES = ['DN', 'CN', 'DE']
+
+
+def _copy_fields(model):
+    return [field.attname for field in model._meta.concrete_fields
+            if field.attname != 'archived_at']
+
+
+def archivable_orders(older_than=None):
+    """
+    Returns the finished orders placed before the archival cutoff.
+    """
+    if older_than is None:
+        older_than = datetime.timedelta(days=settings.ORDER_ARCHIVE_DAYS)
+    return Order.objects.filter(status__in=FINISHED_STATUSES,
+                                created_at__lt=timezone.now() - older_than)
+
+
+@transaction.atomic
+def archive_batch(order_pks) -> int:
+    """
+    Moves orders and their line items to the archive tables.
+    Returns the number of moved orders.
+    """
+    orders = Order.objects.select_for_update() \
+                          .filter(pk__in=order_pks,
+                                  status__in=FINISHED_STATUSES)
+    order_fields = _copy_fields(ArchivedOrder)
+    archived = ArchivedOrder.objects.bulk_create([
+        ArchivedOrder(**row) for row in orders.values(*order_fields)])
+    items = OrderItem.objects.filter(order__in=[order.pk for order in archived])
+    ArchivedOrderItem.objects.bulk_create([
+        ArchivedOrderItem(**row)
+        for row in items.values(*_copy_fields(ArchivedOrderItem))])
+    items.delete()
+    Order.objects.filter(pk__in=[order.pk for order in archived]).delete()
+    return len(archived)
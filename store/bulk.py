@@ -0,0 +1,80 @@
+"""
+Set-based catalog changes for bulk admin actions.
+
+Each change runs as single UPDATE statements inside one transaction,
+however many products are selected, and records one BulkChange row.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least, Round
+
+from .catalog import bump_catalog_version
+from .models import BulkChange, Inventory, Product
+from .stock import check_stock_levels
+
+# Upper bounds of Product.unit_price and Inventory.units_in_stock.
+MAX_UNIT_PRICE = Decimal('99999.99')
+MAX_UNITS_IN_STOCK = 32767
+
+
+def _selected(products):
+    """
+    Strips annotations and prefetches from a queryset of selected products.
+    """
+    return Product.objects.filter(pk__in=products.order_by().values('pk'))
+
+
+def _record(user, action, parameters, row_count) -> BulkChange:
+    transaction.on_commit(bump_catalog_version)
+    return BulkChange.objects.create(changed_by=user, action=action,
+                                     parameters=parameters,
+                                     row_count=row_count)
+
+
+@transaction.atomic
+def set_products_enabled(products, is_enabled, user) -> BulkChange:
+    row_count = _selected(products).update(is_enabled=is_enabled)
+    return _record(user, 'enable_products' if is_enabled else 'disable_products',
+                   {}, row_count)
+
+
+@transaction.atomic
+def change_prices(products, percentage, user) -> BulkChange:
+    """
+    Raises (or lowers, if negative) unit prices by a percentage.
+    """
+    factor = 1 + percentage / 100
+    row_count = _selected(products).update(
+        unit_price=Least(Round(F('unit_price') * factor, 2),
+                         Value(MAX_UNIT_PRICE)))
+    return _record(user, 'change_prices', {'percentage': str(percentage)},
+                   row_count)
+
+
+@transaction.atomic
+def adjust_stock(products, location, units, user) -> BulkChange:
+    """
+    Adds units to (or removes them from) the stock of the selected
+    products at one location, creating missing inventories when adding.
+    """
+    selected = _selected(products)
+    row_count = Inventory.objects.filter(product__in=selected,
+                                         location=location) \
+                                 .update(units_in_stock=Greatest(
+                                     Least(F('units_in_stock') + units,
+                                           MAX_UNITS_IN_STOCK), 0))
+    if units > 0:
+        missing = selected.exclude(inventory__location=location) \
+                          .values_list('pk', flat=True)
+        created = Inventory.objects.bulk_create([
+            Inventory(location=location, product_id=pk,
+                      units_in_stock=min(units, MAX_UNITS_IN_STOCK))
+            for pk in missing.iterator()], batch_size=1000)
+        row_count += len(created)
+    check_stock_levels(Inventory.objects.filter(product__in=selected,
+                                                location=location))
+    return _record(user, 'adjust_stock',
+                   {'location': location.pk, 'units': units}, row_count)
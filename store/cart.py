@@ -0,0 +1,119 @@
+"""
+Shopping cart.
+
+The cart maps product stock keeping units to quantities. Visitors keep it
+in their session; customers keep it in the CartItem table, so it follows
+them across devices, and an anonymous cart is merged into it on login.
+Only views that work with the cart read it, so catalog pages stay
+independent of the visitor and can be cached publicly.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import CartItem, Inventory, Product
+
+
+def get_cart(request) -> dict:
+    """
+    Returns the cart of the current visitor, without creating a session.
+    """
+    if request.user.is_authenticated:
+        return dict(CartItem.objects.filter(user=request.user)
+                                    .values_list('product', 'quantity'))
+    return request.session.get('cart', {})
+
+
+def _upsert_items(user, cart) -> None:
+    # Inserts new items and updates the quantity of existing ones in one
+    # statement (Django 4.1+; Pipfile pins 4.2).
+    CartItem.objects.bulk_create(
+        [CartItem(user=user, product_id=stock_keeping_unit, quantity=quantity)
+         for stock_keeping_unit, quantity in cart.items()],
+        update_conflicts=True, unique_fields=['user', 'product'],
+        update_fields=['quantity', 'updated_at'])
+
+
+@transaction.atomic
+def _store_cart(user, cart) -> None:
+    CartItem.objects.filter(user=user).exclude(product__in=cart.keys()).delete()
+    _upsert_items(user, cart)
+
+
+def save_cart(request, cart) -> None:
+    if request.user.is_authenticated:
+        _store_cart(request.user, cart)
+    else:
+        request.session['cart'] = cart
+
+
+def clear_cart(request) -> None:
+    if request.user.is_authenticated:
+        CartItem.objects.filter(user=request.user).delete()
+    else:
+        request.session.pop('cart', None)
+
+
+def merge_session_cart(request, user) -> None:
+    """
+    Adds the items of the session cart to the customer's cart, up to the
+    units in stock, and empties the session cart.
+    """
+    session_cart = request.session.pop('cart', {})
+    if not session_cart:
+        return
+    units_in_stock = Inventory.objects.filter(product=OuterRef('pk')) \
+                                      .values('product') \
+                                      .annotate(units=Sum('units_in_stock')) \
+                                      .values('units')
+    in_cart = CartItem.objects.filter(user=user, product=OuterRef('pk')) \
+                              .values('quantity')
+    # Stock and current quantities of every product, in one query.
+    products = Product.objects.filter(pk__in=session_cart.keys(),
+                                      is_enabled=True) \
+                              .annotate(units_in_stock=Coalesce(Subquery(units_in_stock), 0),
+                                        in_cart=Coalesce(Subquery(in_cart), 0,
+                                                         output_field=IntegerField())) \
+                              .values_list('pk', 'units_in_stock', 'in_cart')
+    merged = {}
+    for stock_keeping_unit, units, quantity in products:
+        quantity = min(quantity + session_cart[stock_keeping_unit], units)
+        if quantity > 0:
+            merged[stock_keeping_unit] = quantity
+    _upsert_items(user, merged)
+
+
+def cart_context(request) -> dict:
+    """
+    Returns the cart including its products for the template context.
+    """
+    context_cart = get_cart(request)
+    subtotal = 0
+    total_qty = 0
+
+    if len(context_cart) > 0:
+        # If there are items in the cart,
+        # Fetch product objects referred in cart
+        products_in_cart = Product.objects.filter(pk__in=context_cart.keys()) \
+                                          .prefetch_related('productimage_set') \
+                                          .annotate(num_images=Count('productimage'))
+        products_in_cart = {
+            product.stock_keeping_unit: product
+            for product in products_in_cart}
+        # Associate the product objecs to their cart entries
+        context_cart = {
+            stock_keeping_unit: {
+                'quantity': context_cart[stock_keeping_unit],
+                'product': products_in_cart[stock_keeping_unit]}
+            for stock_keeping_unit in context_cart}
+        # Calculate the total
+        for stock_keeping_unit, item in context_cart.items():
+            total_qty += item['quantity']
+            subtotal += item['quantity'] * item['product'].unit_price
+
+    return {'cart': context_cart,
+            'cart_total_qty': total_qty,
+            'cart_subtotal': subtotal,
+            'cart_total': subtotal + settings.DELIVERY_FEE}
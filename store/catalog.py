@@ -0,0 +1,35 @@
+"""
+Catalog version used to key cached catalog fragments.
+
+Any change to categories, products or product images, and any inventory
+going in or out of stock, bumps the version, so fragments cached under
+the previous version are never read again and simply expire.
+"""
+
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'store:catalog_version'
+
+
+def get_catalog_version() -> int:
+    """
+    Fetches the current catalog version, initializing it if needed.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost key never reuses an old version.
+        cache.add(CATALOG_VERSION_KEY, int(time.time()), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """
+    Invalidates every fragment cached for the current catalog version.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, int(time.time()), None)
@@ -0,0 +1,11 @@
+"""
+Cloudinary media storage. Only importable when Cloudinary is configured.
+"""
+
+from cloudinary_storage.storage import MediaCloudinaryStorage
+
+from .storage import CachedURLMixin
+
+
+class CloudinaryMediaStorage(CachedURLMixin, MediaCloudinaryStorage):
+    pass
@@ -0,0 +1,39 @@
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+from . import routers
+
+
+def public_cache(view_func):
+    """
+    Marks successful GET responses of a view as publicly cacheable, so a
+    CDN or reverse proxy may serve them to every visitor.
+
+    The view must not depend on the visitor. As a safeguard, responses
+    that read the session are left private.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') and response.status_code == 200 \
+                and not request.session.accessed:
+            patch_cache_control(response, public=True,
+                                max_age=settings.PUBLIC_CACHE_MAX_AGE)
+        return response
+    return wrapper
+
+
+def replica_reads(view_func):
+    """
+    Sends the database reads of GET requests to a view to read replicas,
+    unless the client recently wrote. See store.routers.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with routers.replica_reads():
+            return view_func(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,67 @@
+"""
+Facet counts for the products sidebar.
+
+Counts per category and a price histogram of the available products are
+computed once per catalog version and kept in the cache, so listing pages
+never aggregate the catalog themselves.
+"""
+
+import math
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .catalog import get_catalog_version
+from .models import Category, Product
+
+# Number of bars in the price histogram.
+PRICE_HISTOGRAM_BUCKETS = 5
+
+
+def compute_facets() -> dict:
+    """
+    Computes category counts and the price histogram of all enabled,
+    in-stock products.
+    """
+    available = Product.objects.filter(is_enabled=True) \
+                               .annotate(total_inv=Sum('inventory__units_in_stock')) \
+                               .filter(total_inv__gt=0) \
+                               .order_by()
+    rows = list(available.values_list('category', 'unit_price'))
+
+    counts = Counter(category_pk for category_pk, _ in rows)
+    categories = [{'slug': category.slug,
+                   'name': category.name,
+                   'count': counts[category.slug]}
+                  for category in Category.objects.all()]
+
+    price_histogram = []
+    if rows:
+        prices = [price for _, price in rows]
+        low, high = math.floor(min(prices)), math.ceil(max(prices))
+        width = max(1, math.ceil((high - low + 1) / PRICE_HISTOGRAM_BUCKETS))
+        bucket_counts = Counter(int((price - low) // width) for price in prices)
+        # Bounds are inclusive, as in the price filter.
+        price_histogram = [{'min_price': Decimal(low + bucket * width),
+                            'max_price': Decimal(low + (bucket + 1) * width)
+                            - Decimal('0.01'),
+                            'count': bucket_counts[bucket]}
+                           for bucket in range(PRICE_HISTOGRAM_BUCKETS)
+                           if low + bucket * width <= high]
+
+    return {'categories': categories, 'price_histogram': price_histogram}
+
+
+def catalog_facets() -> dict:
+    """
+    Returns the facets of the current catalog version.
+    """
+    key = 'store:facets:%s' % get_catalog_version()
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets()
+        cache.set(key, facets, settings.FRAGMENT_CACHE_TIMEOUT)
+    return facets
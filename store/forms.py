@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 
-from .models import Order
+from .models import Location, Order
 
 
 class CartAddForm(forms.Form):
@@ -25,6 +25,28 @@ class CartAddForm(forms.Form):
         return quantity
 
 
+class ProductFilterForm(forms.Form):
+    search = forms.CharField(required=False)
+    min_price = forms.DecimalField(required=False, min_value=0,
+                                   max_digits=7, decimal_places=2)
+    max_price = forms.DecimalField(required=False, min_value=0,
+                                   max_digits=7, decimal_places=2)
+    include_out_of_stock = forms.BooleanField(required=False)
+
+    def clean(self):
+        cleaned_data = super(ProductFilterForm, self).clean()
+
+        # Validate price range
+        min_price = cleaned_data.get('min_price')
+        max_price = cleaned_data.get('max_price')
+        if min_price is not None and max_price is not None \
+                and min_price > max_price:
+            raise forms.ValidationError(
+                'The minimum price must not exceed the maximum price.')
+
+        return cleaned_data
+
+
 class RegistrationForm(forms.ModelForm):
     confirm_password = forms.CharField(widget=forms.PasswordInput())
 
@@ -62,3 +84,17 @@ class PersonalDetailsChangeForm(forms.ModelForm):
     class Meta:
         model = User
         fields = ['first_name', 'last_name', 'email', 'username']
+
+
+class PriceChangeForm(forms.Form):
+    percentage = forms.DecimalField(max_digits=5, decimal_places=2,
+                                    min_value=-99, max_value=1000,
+                                    help_text='e.g. 10 to raise prices by '
+                                              '10%, -5 to lower them by 5%.')
+
+
+class StockAdjustmentForm(forms.Form):
+    location = forms.ModelChoiceField(queryset=Location.objects.all())
+    units = forms.IntegerField(min_value=-32767, max_value=32767,
+                               help_text='Units to add, or negative to '
+                                         'remove. Stock never drops below 0.')
@@ -0,0 +1,85 @@
+"""
+Order status transitions.
+
+Orders move forward from NEW to DONE, or end early as CANCELLED or
+DENIED; finished orders never change again. Ending an order early
+returns its units to the inventories they were taken from, with one
+UPDATE for all the line items of a batch of orders.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .bulk import MAX_UNITS_IN_STOCK
+from .catalog import bump_catalog_version
+from .models import Inventory, Order, OrderItem
+from .stock import check_stock_levels
+
+# Statuses each status may change to.
+TRANSITIONS = {
+    'NW': {'PR', 'CN', 'DE'},
+    'PR': {'DL', 'CN', 'DE'},
+    'DL': {'DN', 'CN'},
+    'DN': set(),
+    'CN': set(),
+    'DE': set(),
+}
+
+# Statuses that put the units of an order back in stock.
+RESTOCKING_STATUSES = {'CN', 'DE'}
+
+# Number of orders changed per transaction.
+TRANSITION_BATCH_SIZE = 500
+
+
+def can_transition(current, status) -> bool:
+    return status in TRANSITIONS.get(current, set())
+
+
+def restore_stock(order_pks) -> int:
+    """
+    Returns the units of the line items of some orders to the inventories
+    they were taken from. Returns the number of updated inventories.
+    """
+    items = OrderItem.objects.filter(order__in=order_pks, product__isnull=False)
+    # Line items from before locations were recorded go back to the first
+    # inventory of their product.
+    items.filter(location__isnull=True).update(location=Subquery(
+        Inventory.objects.filter(product=OuterRef('product'))
+                         .order_by('pk').values('location')[:1]))
+    located = items.filter(product=OuterRef('product'),
+                           location=OuterRef('location'))
+    restored_units = located.values('product') \
+                            .annotate(units=Sum('quantity')) \
+                            .values('units')
+    inventories = Inventory.objects.filter(Exists(located))
+    num_restored = inventories.update(units_in_stock=Least(
+        F('units_in_stock') + Subquery(restored_units), MAX_UNITS_IN_STOCK))
+    check_stock_levels(inventories)
+    return num_restored
+
+
+@transaction.atomic
+def _transition_batch(order_pks, status) -> int:
+    sources = [current for current in TRANSITIONS
+               if can_transition(current, status)]
+    order_pks = list(Order.objects.select_for_update()
+                                  .filter(pk__in=order_pks, status__in=sources)
+                                  .values_list('pk', flat=True))
+    if status in RESTOCKING_STATUSES and restore_stock(order_pks):
+        transaction.on_commit(bump_catalog_version)
+    # update() skips auto_now, which the sales rollups rely on.
+    return Order.objects.filter(pk__in=order_pks) \
+                        .update(status=status, updated_at=timezone.now())
+
+
+def transition_orders(orders, status, batch_size=TRANSITION_BATCH_SIZE) -> int:
+    """
+    Changes the status of the given orders that may take it, one batch per
+    transaction. Returns the number of changed orders.
+    """
+    order_pks = list(orders.order_by('pk').values_list('pk', flat=True))
+    return sum(_transition_batch(order_pks[start:start + batch_size], status)
+               for start in range(0, len(order_pks), batch_size))
@@ -0,0 +1,36 @@
+"""
+Template loader that collapses the indentation of the store's templates.
+
+The storefront templates are deeply indented, and every rendered page
+repeats that whitespace. It is removed once, when a template is loaded
+(and then cached by the cached loader), instead of on every response.
+"""
+
+import re
+
+from django.template.loaders import app_directories
+
+# Whitespace is significant inside these elements.
+PRESERVED_RE = re.compile(r'(<(pre|textarea)\b.*?</\2\s*>)',
+                          re.IGNORECASE | re.DOTALL)
+# Trailing whitespace, blank lines and indentation. Line breaks are kept,
+# so inline scripts and comments keep their meaning.
+LINE_BREAK_RE = re.compile(r'[ \t]*\n\s*')
+
+COLLAPSED_PREFIXES = ('store/',)
+
+
+def collapse_whitespace(source) -> str:
+    parts = PRESERVED_RE.split(source)
+    # split() yields text, element, tag name, text, element, tag name...
+    for index in range(0, len(parts), 3):
+        parts[index] = LINE_BREAK_RE.sub('\n', parts[index])
+    return ''.join(part for index, part in enumerate(parts) if index % 3 != 2)
+
+
+class Loader(app_directories.Loader):
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.template_name.startswith(COLLAPSED_PREFIXES):
+            return collapse_whitespace(contents)
+        return contents
@@ -0,0 +1,80 @@
+"""
+Shared helpers for the bench_* management commands.
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+def measure(func, iterations, setup=None):
+    """
+    Calls func() the given number of times and returns the per-call
+    durations in milliseconds. setup() runs before every call, untimed.
+    """
+    durations = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarize(label, durations):
+    """
+    Formats mean/p50/p95 of a list of millisecond durations as one line.
+    """
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return '%-32s mean %9.3f ms   p50 %9.3f ms   p95 %9.3f ms' % (
+        label, statistics.mean(ordered), statistics.median(ordered), p95)
+
+
+@contextmanager
+def test_database():
+    """
+    Runs the enclosed block against a throwaway test database, so
+    benchmarks can create fixtures without touching real data.
+    """
+    connection = connections['default']
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                       serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def create_catalog(num_products, num_categories=5):
+    """
+    Creates enabled, in-stock products spread over a few categories.
+    """
+    from store.models import Category, Inventory, Location, Product
+
+    location = Location.objects.create(name='Warehouse', address='-',
+                                       city='-', province='-', region='-')
+    categories = Category.objects.bulk_create([
+        Category(name='Category %d' % i, slug='category-%d' % i)
+        for i in range(num_categories)])
+    products = Product.objects.bulk_create([
+        Product(category=categories[i % num_categories],
+                title='Product %d' % i,
+                stock_keeping_unit='product-%05d' % i,
+                body='<p>Details of <b>product %d</b>.</p>' % i,
+                unit_cost=Decimal('50.00'),
+                unit_price=Decimal('75.00') + i % 100,
+                is_enabled=True)
+        for i in range(num_products)])
+    Inventory.objects.bulk_create([
+        Inventory(location=location, product=product, units_in_stock=100)
+        for product in products])
+    return products
@@ -0,0 +1,32 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from store.archive import archivable_orders, archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Moves finished orders older than ORDER_ARCHIVE_DAYS to the ' \
+           'archive tables, in batches. Safe to interrupt and rerun.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int,
+                            help='Overrides ORDER_ARCHIVE_DAYS.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        older_than = None
+        if options['older_than_days'] is not None:
+            older_than = datetime.timedelta(days=options['older_than_days'])
+        num_orders = 0
+        while True:
+            order_pks = list(archivable_orders(older_than)
+                             .order_by('pk')
+                             .values_list('pk', flat=True)[:options['batch_size']])
+            if not order_pks:
+                break
+            num_orders += archive_batch(order_pks)
+            self.stdout.write('Archived %d orders...' % num_orders)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Archived %d orders.' % num_orders))
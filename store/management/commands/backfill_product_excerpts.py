@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from store.catalog import bump_catalog_version
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Generates the sanitized body and listing excerpt of existing ' \
+           'products, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        num_products = 0
+        last_pk = ''
+        while True:
+            batch = list(Product.objects.filter(pk__gt=last_pk)
+                                        .order_by('pk')
+                                        .only('pk', 'body')[:options['batch_size']])
+            if not batch:
+                break
+            for product in batch:
+                product.update_body_text()
+            Product.objects.bulk_update(batch, ['body_html', 'excerpt'])
+            num_products += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write('Processed %d products...' % num_products)
+
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            'Generated excerpts of %d products.' % num_products))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ._benchmark import measure, summarize
+
+
+class Command(BaseCommand):
+    help = 'Compares the cost of a fresh database connection per request ' \
+           'against a reused persistent connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        iterations = options['iterations']
+
+        def query():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+
+        self.stdout.write('Database: %s (%s)' % (options['database'],
+                                                 connection.vendor))
+
+        # Connect + query, as with CONN_MAX_AGE = 0.
+        fresh = measure(query, iterations, setup=connection.close)
+        # Query on an already open connection, as with persistent connections.
+        connection.ensure_connection()
+        persistent = measure(query, iterations)
+        connection.close()
+
+        self.stdout.write(summarize('new connection per request', fresh))
+        self.stdout.write(summarize('persistent connection', persistent))
+        saved = sum(fresh) / iterations - sum(persistent) / iterations
+        self.stdout.write(self.style.SUCCESS(
+            'Connection setup cost: %.3f ms per request' % saved))
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from store.models import Product, ProductImage
+from store.storage import CachedURLMixin
+
+from ._benchmark import create_catalog, measure, summarize, test_database
+
+
+class Command(BaseCommand):
+    help = 'Measures media URL generation for a products listing with and ' \
+           'without the per-process URL cache of the configured storage.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # A fresh instance of the configured storage, with an empty cache.
+        storage = import_string(settings.DEFAULT_FILE_STORAGE)()
+        if not isinstance(storage, CachedURLMixin):
+            raise CommandError('%s does not cache URLs.' % type(storage).__name__)
+
+        with test_database():
+            create_catalog(options['products'])
+            ProductImage.objects.bulk_create([
+                ProductImage(product=product,
+                             image='products/%s.jpg' % product.pk)
+                for product in Product.objects.all()])
+            names = list(ProductImage.objects.values_list('image', flat=True))
+
+        def uncached_urls():
+            # The storage's own url(), as called before caching.
+            return [super(CachedURLMixin, storage).url(name) for name in names]
+
+        def cached_urls():
+            return [storage.url(name) for name in names]
+
+        before = measure(uncached_urls, options['iterations'])
+        cached_urls()
+        after = measure(cached_urls, options['iterations'])
+
+        label = '%d URLs (%s)' % (len(names), type(storage).__name__)
+        self.stdout.write(summarize('before: ' + label, before))
+        self.stdout.write(summarize('after:  ' + label, after))
+        self.stdout.write(self.style.SUCCESS(
+            'Speed-up: %.2fx' % (sum(before) / sum(after))))
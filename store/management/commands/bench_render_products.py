@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from store import views
+
+from ._benchmark import create_catalog, measure, summarize, test_database
+
+UNCACHED_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'store.loaders.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = 'Measures rendering of the products listing with and without ' \
+           'the cached template loader and fragment caching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def render(self):
+        request = RequestFactory().get('/products/')
+        SessionMiddleware(lambda request: None).process_request(request)
+        request.user = AnonymousUser()
+        views.products(request)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        uncached_templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=UNCACHED_LOADERS))]
+        cached_templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=[
+                ('django.template.loaders.cached.Loader', UNCACHED_LOADERS)]))]
+
+        with test_database():
+            create_catalog(options['products'])
+
+            # Before: templates parsed on every render, no fragment cache.
+            with override_settings(TEMPLATES=uncached_templates):
+                before = measure(self.render, iterations, setup=cache.clear)
+
+            # After: compiled templates and warm fragments.
+            with override_settings(TEMPLATES=cached_templates):
+                self.render()
+                after = measure(self.render, iterations)
+
+        label = 'products.html (%d products)' % options['products']
+        self.stdout.write(summarize('before: ' + label, before))
+        self.stdout.write(summarize('after:  ' + label, after))
+        self.stdout.write(self.style.SUCCESS(
+            'Speed-up: %.2fx' % (sum(before) / sum(after))))
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Imports what a gunicorn worker imports before serving its first request.
+STARTUP_SCRIPT = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'food_store.settings')
+from food_store.wsgi import application
+if %(warm)r:
+    from food_store.warmup import warm_up
+    warm_up()
+"""
+
+
+class Command(BaseCommand):
+    help = 'Starts the WSGI application in a fresh interpreter and reports ' \
+           'the import time per module.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25,
+                            help='Number of modules to list.')
+        parser.add_argument('--warm', action='store_true',
+                            help='Also run the preload warm-up.')
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT % {'warm': options['warm']}
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                cwd=settings.BASE_DIR, env=os.environ.copy(),
+                                capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            self.stderr.write(result.stderr)
+            return
+
+        modules = []
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'imported package' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+        self.stdout.write('%12s %12s  %s' % ('cumulative', 'self', 'module'))
+        for cumulative_us, self_us, name in sorted(modules, reverse=True)[:options['top']]:
+            self.stdout.write('%9.1f ms %9.1f ms  %s' % (cumulative_us / 1000,
+                                                          self_us / 1000, name))
+
+        total_imports = sum(self_us for _, self_us, _ in modules) / 1000
+        self.stdout.write(self.style.SUCCESS(
+            'Imported %d modules in %.1f ms; process startup took %.1f ms'
+            % (len(modules), total_imports, elapsed)))
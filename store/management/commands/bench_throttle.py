@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from store.throttling import throttle
+
+from ._benchmark import measure, summarize
+
+
+def plain_view(request):
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = 'Measures the per-request overhead of the throttle decorator ' \
+           'with the configured cache, for allowed and rejected requests. ' \
+           'Counters it creates expire after two minutes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        factory = RequestFactory()
+        throttled_view = throttle('bench')(plain_view)
+        clients = iter(range(10 ** 9))
+
+        def allowed():
+            # A new client each time, so every request is within budget.
+            throttled_view(factory.get('/', REMOTE_ADDR='10.%d.0.1' % next(clients)))
+
+        def rejected():
+            throttled_view(factory.get('/', REMOTE_ADDR='10.255.255.255'))
+
+        def unthrottled():
+            plain_view(factory.get('/'))
+
+        with override_settings(THROTTLE_RATES={'bench': '1/m'}):
+            baseline = measure(unthrottled, iterations)
+            within = measure(allowed, iterations)
+            rejected()
+            over = measure(rejected, iterations)
+
+        self.stdout.write(summarize('no throttle', baseline))
+        self.stdout.write(summarize('throttle, allowed', within))
+        self.stdout.write(summarize('throttle, rejected (429)', over))
+        overhead = (sum(within) - sum(baseline)) / iterations
+        self.stdout.write(self.style.SUCCESS(
+            'Throttle overhead per allowed request: %.3f ms' % overhead))
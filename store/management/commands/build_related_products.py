@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from store.recommendations import build_related_products
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the related products of every product from ' \
+           'co-purchases. Meant to run periodically, e.g. nightly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of orders counted per query.')
+
+    def handle(self, *args, **options):
+        num_rows = build_related_products(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Stored %d related products.' % num_rows))
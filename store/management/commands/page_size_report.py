@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from store import middleware
+
+from ._benchmark import create_catalog, test_database
+
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+COLLAPSING_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'store.loaders.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = 'Reports the bytes transferred for the main store pages: raw, ' \
+           'with collapsed whitespace, and compressed with gzip and brotli.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200)
+
+    def transferred(self, url, loaders, encoding='identity'):
+        templates = [dict(settings.TEMPLATES[0], OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=loaders))]
+        cache.clear()
+        client = Client()
+        session = client.session
+        session['cart'] = self.cart
+        session.save()
+        with override_settings(TEMPLATES=templates):
+            response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        if encoding != 'identity' and response.get('Content-Encoding') != encoding:
+            return None
+        return len(response.content)
+
+    def handle(self, *args, **options):
+        with test_database():
+            products = create_catalog(options['products'])
+            self.cart = {product.pk: 1 for product in products[:5]}
+            pages = [
+                ('index', reverse('store:index')),
+                ('products', reverse('store:products')),
+                ('category', reverse('store:products', args=['category-0'])),
+                ('product', reverse('store:add_to_cart', args=[products[0].pk])),
+                ('cart', reverse('store:view_cart')),
+                ('session fragment', reverse('store:session_fragment')),
+            ]
+            rows = [(name,
+                     self.transferred(url, PLAIN_LOADERS),
+                     self.transferred(url, COLLAPSING_LOADERS),
+                     self.transferred(url, COLLAPSING_LOADERS, 'gzip'),
+                     self.transferred(url, COLLAPSING_LOADERS, 'br'))
+                    for name, url in pages]
+
+        self.stdout.write('%-18s %10s %10s %10s %10s' % (
+            'Page', 'Raw', 'Collapsed', 'gzip', 'br'))
+        for row in rows:
+            self.stdout.write('%-18s %10s %10s %10s %10s' % tuple(
+                '-' if value is None else value for value in row))
+        if middleware.brotli is None:
+            self.stdout.write('Install the brotli package for brotli sizes.')
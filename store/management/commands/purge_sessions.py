@@ -0,0 +1,88 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+def is_abandoned(data) -> bool:
+    """
+    Whether a session holds nothing but an empty cart: no login, no
+    cart items, no pending messages.
+    """
+    return set(data) <= {'cart'} and not data.get('cart')
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions, and idle sessions holding nothing but ' \
+           'an empty cart, in small batches with pauses in between, so it ' \
+           'can run during traffic. Meant for the database session backend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help='Seconds to pause between batches.')
+        parser.add_argument('--idle-days', type=int, default=7,
+                            help='Days without changes after which a '
+                                 'session with an empty cart is dropped.')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.pause = options['sleep']
+        self.started = time.monotonic()
+        self.num_deleted = 0
+
+        num_expired = self.purge_expired()
+        num_abandoned = self.purge_abandoned(options['idle_days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d expired and %d abandoned sessions (%s).'
+            % (num_expired, num_abandoned, self.rate())))
+
+    def rate(self) -> str:
+        elapsed = time.monotonic() - self.started
+        return '%.0f rows/s over %.1f s' % (self.num_deleted / max(elapsed, 1e-6),
+                                           elapsed)
+
+    def delete(self, sessions) -> int:
+        num_deleted, _ = sessions.delete()
+        self.num_deleted += num_deleted
+        self.stdout.write('Deleted %d sessions, %s...'
+                          % (self.num_deleted, self.rate()))
+        time.sleep(self.pause)
+        return num_deleted
+
+    def purge_expired(self) -> int:
+        now = timezone.now()
+        num_expired = 0
+        while True:
+            # Deleted rows drop out of the filter, so no cursor is needed.
+            session_keys = list(Session.objects.filter(expire_date__lt=now)
+                                               .values_list('pk', flat=True)
+                                               [:self.batch_size])
+            if not session_keys:
+                return num_expired
+            num_expired += self.delete(
+                Session.objects.filter(pk__in=session_keys))
+
+    def purge_abandoned(self, idle_days) -> int:
+        # Sessions expire SESSION_COOKIE_AGE after their last save.
+        saved_before = timezone.now() - datetime.timedelta(days=idle_days)
+        expire_before = saved_before + datetime.timedelta(
+            seconds=settings.SESSION_COOKIE_AGE)
+        idle = Session.objects.filter(expire_date__lt=expire_before)
+        num_abandoned = 0
+        last_key = ''
+        while True:
+            batch = list(idle.filter(pk__gt=last_key)
+                             .order_by('pk')[:self.batch_size])
+            if not batch:
+                return num_abandoned
+            last_key = batch[-1].pk
+            session_keys = [session.pk for session in batch
+                            if is_abandoned(session.get_decoded())]
+            if session_keys:
+                # Sessions saved since they were read are no longer idle.
+                num_abandoned += self.delete(idle.filter(pk__in=session_keys))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.rankings import refresh_product_rankings, refresh_product_sales
+
+
+class Command(BaseCommand):
+    help = 'Counts new sales and rewrites the top and recent product ' \
+           'rankings. Meant to run periodically, e.g. from a scheduler.'
+
+    def handle(self, *args, **options):
+        num_items = refresh_product_sales()
+        refresh_product_rankings()
+        self.stdout.write(self.style.SUCCESS(
+            'Counted %d new order items and refreshed rankings.' % num_items))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from store.sales import refresh_sales_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily sales rollups of days with orders placed ' \
+           'or updated since the last run. Meant to run periodically, ' \
+           'e.g. from a scheduler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Recompute the rollups of every day.')
+
+    def handle(self, *args, **options):
+        num_days = refresh_sales_rollups(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(
+            'Refreshed the sales rollups of %d days.' % num_days))
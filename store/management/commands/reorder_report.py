@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from store.stock import reorder_report
+
+
+class Command(BaseCommand):
+    help = 'Lists inventories that are low or will run out within the ' \
+           'lead time, with reorder quantities based on recent sales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help='Days of sales to compute velocity from.')
+        parser.add_argument('--lead-time-days', type=int, default=7)
+        parser.add_argument('--cover-days', type=int, default=14,
+                            help='Days of sales a reorder should cover '
+                                 'after it arrives.')
+
+    def handle(self, *args, **options):
+        rows = reorder_report(options['days'], options['lead_time_days'],
+                              options['cover_days'])
+        self.stdout.write('%-32s %-20s %8s %8s %10s %10s %8s' % (
+            'Product', 'Location', 'Stock', 'Level', 'Units/day',
+            'Days left', 'Reorder'))
+        for row in rows:
+            inventory = row['inventory']
+            days_left = row['days_left']
+            self.stdout.write('%-32s %-20s %8d %8d %10.2f %10s %8d' % (
+                inventory.product_id[:32], inventory.location.name[:20],
+                inventory.units_in_stock, inventory.reorder_level,
+                row['units_per_day'],
+                '-' if days_left is None else '%.1f' % days_left,
+                row['reorder_units']))
+        self.stdout.write(self.style.SUCCESS(
+            '%d inventories to reorder.' % len(rows)))
@@ -0,0 +1,74 @@
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .routers import PIN_COOKIE_NAME, request_routing
+
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip.
+    brotli = None
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keeps clients that wrote to the database on the primary for a short
+    while, so replication lag never hides their own changes from them.
+    Must come before middleware that writes, such as SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = PIN_COOKIE_NAME in request.COOKIES
+        with request_routing(pinned=pinned) as routing:
+            response = self.get_response(request)
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(PIN_COOKIE_NAME, '1',
+                                max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with brotli when the client accepts it and the
+    brotli package is installed, and with gzip otherwise.
+
+    Responses that used the CSRF token always get gzip, whose output
+    GZipMiddleware pads with random bytes against BREACH-style length
+    attacks since Django 4.2 (the version pinned in the Pipfile).
+    """
+
+    def process_response(self, request, response):
+        if brotli is None or response.streaming \
+                or self.used_csrf_token(request) \
+                or not re_accepts_brotli.search(
+                    request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+
+        if len(response.content) < 200 or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli.compress(response.content,
+                                             quality=settings.BROTLI_QUALITY)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    @staticmethod
+    def used_csrf_token(request) -> bool:
+        # Django 4.1 renamed the flag get_token() sets.
+        return bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+                    or request.META.get('CSRF_COOKIE_USED'))
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_product_body_html_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['placed_by', '-created_at', '-id'], name='order_placed_by_created_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('store', '0012_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('status', models.CharField(choices=[('NW', 'NEW'), ('PR', 'PROCESSING'), ('DL', 'DELIVERING'), ('DN', 'DONE'), ('DE', 'DENIED'), ('CN', 'CANCELLED')], max_length=2)),
+                ('billing_first_name', models.CharField(max_length=64)),
+                ('billing_last_name', models.CharField(max_length=64)),
+                ('billing_address', models.CharField(max_length=255)),
+                ('billing_city', models.CharField(max_length=255)),
+                ('billing_province', models.CharField(max_length=255)),
+                ('billing_region', models.CharField(max_length=255)),
+                ('billing_zip', models.CharField(max_length=10)),
+                ('billing_phone', models.CharField(max_length=13)),
+                ('shipping_first_name', models.CharField(max_length=64)),
+                ('shipping_last_name', models.CharField(max_length=64)),
+                ('shipping_address', models.CharField(max_length=255)),
+                ('shipping_city', models.CharField(max_length=255)),
+                ('shipping_province', models.CharField(max_length=255)),
+                ('shipping_region', models.CharField(max_length=255)),
+                ('shipping_phone', models.CharField(max_length=13)),
+                ('shipping_zip', models.CharField(max_length=10)),
+                ('delivery_fee', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('placed_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('quantity', models.PositiveSmallIntegerField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orderitem_set', related_query_name='orderitem', to='store.archivedorder')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='store.product')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['placed_by', '-created_at', '-id'], name='archived_order_placed_by_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['created_at'], name='archived_order_created_idx'),
+        ),
+    ]
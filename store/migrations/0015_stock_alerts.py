@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_orderitem_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='reorder_level',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('units_in_stock', models.PositiveSmallIntegerField()),
+                ('reorder_level', models.PositiveSmallIntegerField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.inventory')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+import html
+import re
+
+import bleach
+from django.db import migrations
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+BATCH_SIZE = 200
+
+# Frozen copy of the sanitizing rules in store.text at the time of this
+# migration, so later changes to them do not change what it does.
+ALLOWED_TAGS = frozenset([
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span',
+    'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead',
+    'tr', 'u', 'ul',
+])
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title', 'target'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan'],
+}
+DROPPED_ELEMENTS_RE = re.compile(r'<(script|style)\b.*?</\1\s*>',
+                                 re.IGNORECASE | re.DOTALL)
+EXCERPT_LENGTH = 160
+
+
+def sanitize_html(body):
+    body = DROPPED_ELEMENTS_RE.sub('', body)
+    return bleach.clean(body, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+                        strip=True, strip_comments=True)
+
+
+def plain_text_excerpt(body):
+    text = html.unescape(strip_tags(body))
+    text = re.sub(r'\s+', ' ', text).strip()
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+def backfill_body_html(apps, schema_editor):
+    """
+    Derives the sanitized body and excerpt of products saved before they
+    were stored.
+    """
+    Product = apps.get_model('store', 'Product')
+    pending = Product.objects.filter(body__isnull=False, body_html__isnull=True) \
+                             .order_by('pk') \
+                             .only('pk', 'body')
+    last_pk = ''
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        for product in batch:
+            product.body_html = sanitize_html(product.body)
+            product.excerpt = plain_text_excerpt(product.body_html)
+        Product.objects.bulk_update(batch, ['body_html', 'excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_cartitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_body_html, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from .text import plain_text_excerpt, sanitize_html
+
 # Create your models here.
 
 
@@ -26,6 +28,26 @@ class Product(models.Model):
     unit_cost = models.DecimalField(max_digits=7, decimal_places=2)
     unit_price = models.DecimalField(max_digits=7, decimal_places=2)
     is_enabled = models.BooleanField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Derived from body on save
+    body_html = models.TextField(null=True, blank=True, editable=False)
+    excerpt = models.CharField(max_length=255, blank=True, default='',
+                               editable=False)
+
+    def save(self, *args, **kwargs):
+        self.update_body_text()
+        super().save(*args, **kwargs)
+
+    def update_body_text(self) -> None:
+        """
+        Derives the sanitized HTML body and the listing excerpt from body.
+        """
+        if self.body is None:
+            self.body_html = None
+            self.excerpt = ''
+        else:
+            self.body_html = sanitize_html(self.body)
+            self.excerpt = plain_text_excerpt(self.body_html)
 
     def is_in_stock(self) -> bool:
         """
@@ -59,6 +81,22 @@ class WishlistItem(models.Model):
     product = models.ForeignKey(to=Product, on_delete=models.CASCADE)
 
 
+class CartItem(models.Model):
+    """
+    A product in the persistent cart of a customer.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'],
+                                    name='unique_cart_item'),
+        ]
+
+    user = models.ForeignKey(to=User, on_delete=models.CASCADE)
+    product = models.ForeignKey(to=Product, on_delete=models.CASCADE)
+    quantity = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class Location(models.Model):
     name = models.CharField(max_length=64)
     address = models.CharField(max_length=255)
@@ -77,12 +115,28 @@ class Inventory(models.Model):
     location = models.ForeignKey(to=Location, on_delete=models.CASCADE)
     product = models.ForeignKey(to=Product, on_delete=models.CASCADE)
     units_in_stock = models.PositiveSmallIntegerField()
+    # A StockAlert is raised when units in stock fall to this level.
+    reorder_level = models.PositiveSmallIntegerField(default=0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets saves tell whether they took the inventory in or out of stock.
+        instance.was_in_stock = instance.is_in_stock() \
+            if 'units_in_stock' in field_names else None
+        return instance
 
     def is_in_stock(self) -> bool:
         return self.units_in_stock > 0
 
 
-class Order(models.Model):
+class AbstractOrder(models.Model):
+    """
+    Fields shared by live and archived orders.
+    """
+    class Meta:
+        abstract = True
+
     placed_by = models.ForeignKey(to=User, null=True,
                                   on_delete=models.CASCADE)
     status = models.CharField(max_length=2,
@@ -119,12 +173,201 @@ class Order(models.Model):
         return total
 
 
-class OrderItem(models.Model):
-    order = models.ForeignKey(to=Order, on_delete=models.CASCADE)
+class Order(AbstractOrder):
+    class Meta:
+        indexes = [
+            models.Index(fields=['placed_by', '-created_at', '-id'],
+                         name='order_placed_by_created_idx'),
+            models.Index(fields=['updated_at'],
+                         name='order_updated_at_idx'),
+            models.Index(fields=['created_at'],
+                         name='order_created_at_idx'),
+        ]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bulk updates must set this explicitly; sales rollups depend on it.
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class AbstractOrderItem(models.Model):
+    class Meta:
+        abstract = True
+
     product = models.ForeignKey(to=Product, null=True,
                                 on_delete=models.CASCADE)
     unit_price = models.DecimalField(max_digits=7, decimal_places=2)
     quantity = models.PositiveSmallIntegerField()
+    # Where the units were taken from, so cancellations can return them.
+    location = models.ForeignKey(to=Location, null=True, blank=True,
+                                 on_delete=models.SET_NULL)
 
     def total(self):
         return self.unit_price * self.quantity
+
+
+class OrderItem(AbstractOrderItem):
+    order = models.ForeignKey(to=Order, on_delete=models.CASCADE)
+
+
+class ArchivedOrder(AbstractOrder):
+    """
+    A finished order moved out of the live tables by archive_orders.
+    Keeps the id, timestamps and line items of the original order.
+    """
+    class Meta:
+        indexes = [
+            models.Index(fields=['placed_by', '-created_at', '-id'],
+                         name='archived_order_placed_by_idx'),
+            models.Index(fields=['created_at'],
+                         name='archived_order_created_idx'),
+        ]
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+
+class ArchivedOrderItem(AbstractOrderItem):
+    # Same accessors as on live orders, so both render and aggregate alike.
+    order = models.ForeignKey(to=ArchivedOrder, on_delete=models.CASCADE,
+                              related_name='orderitem_set',
+                              related_query_name='orderitem')
+
+
+class Watermark(models.Model):
+    """
+    Position up to which an incremental job has processed its source rows.
+    """
+    name = models.CharField(primary_key=True, max_length=64)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ProductSales(models.Model):
+    class Meta:
+        verbose_name_plural = 'product sales'
+
+    product = models.OneToOneField(to=Product, primary_key=True,
+                                   on_delete=models.CASCADE)
+    units_sold = models.PositiveIntegerField(default=0)
+
+
+class ProductRanking(models.Model):
+    class Meta:
+        ordering = ['kind', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'rank'],
+                                    name='unique_product_ranking_rank'),
+        ]
+
+    TOP = 'TP'
+    RECENT = 'RC'
+
+    kind = models.CharField(max_length=2,
+                            choices=[
+                                (TOP, 'TOP'),
+                                (RECENT, 'RECENT')])
+    rank = models.PositiveSmallIntegerField()
+    product = models.ForeignKey(to=Product, on_delete=models.CASCADE)
+
+
+class RelatedProduct(models.Model):
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'],
+                                    name='unique_related_product_rank'),
+        ]
+
+    product = models.ForeignKey(to=Product, related_name='related_products',
+                                on_delete=models.CASCADE)
+    related = models.ForeignKey(to=Product, related_name='related_from',
+                                on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    times_bought_together = models.PositiveIntegerField(default=0)
+
+
+class BulkChange(models.Model):
+    """
+    Audit record of one bulk admin action.
+    """
+    class Meta:
+        ordering = ['-created_at']
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    changed_by = models.ForeignKey(to=User, null=True,
+                                   on_delete=models.SET_NULL)
+    action = models.CharField(max_length=64)
+    parameters = models.JSONField(default=dict, blank=True)
+    row_count = models.PositiveIntegerField()
+
+
+class DailySales(models.Model):
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        ordering = ['-date', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'status'],
+                                    name='unique_daily_sales'),
+        ]
+
+    date = models.DateField()
+    status = models.CharField(max_length=2)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    delivery_fees = models.DecimalField(max_digits=12, decimal_places=2,
+                                        default=0)
+
+
+class DailyProductSales(models.Model):
+    class Meta:
+        verbose_name_plural = 'daily product sales'
+        indexes = [
+            models.Index(fields=['date', 'status'],
+                         name='daily_product_sales_date_idx'),
+        ]
+
+    date = models.DateField()
+    status = models.CharField(max_length=2)
+    product = models.ForeignKey(to=Product, null=True,
+                                on_delete=models.SET_NULL)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+
+class DailyCategorySales(models.Model):
+    class Meta:
+        verbose_name_plural = 'daily category sales'
+        indexes = [
+            models.Index(fields=['date', 'status'],
+                         name='daily_category_sales_date_idx'),
+        ]
+
+    date = models.DateField()
+    status = models.CharField(max_length=2)
+    category = models.ForeignKey(to=Category, null=True,
+                                 on_delete=models.SET_NULL)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+
+class StockAlert(models.Model):
+    """
+    An inventory falling to its reorder level. Resolved once restocked
+    above it.
+    """
+    class Meta:
+        ordering = ['-created_at']
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    inventory = models.ForeignKey(to=Inventory, on_delete=models.CASCADE)
+    units_in_stock = models.PositiveSmallIntegerField()
+    reorder_level = models.PositiveSmallIntegerField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,93 @@
+"""
+Customer order queries, over live and archived orders alike.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Prefetch, \
+    Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+# Number of orders per order history page.
+ORDERS_PER_PAGE = 20
+
+
+def with_totals(queryset):
+    """
+    Annotates orders with their item count and grand total, computed by
+    the database in the same query.
+    """
+    line_total = ExpressionWrapper(F('orderitem__unit_price') * F('orderitem__quantity'),
+                                   output_field=DecimalField(max_digits=12,
+                                                             decimal_places=2))
+    return queryset.annotate(
+        num_items=Coalesce(Sum('orderitem__quantity'), 0),
+        order_total=Coalesce(Sum(line_total), Value(Decimal('0.00'))) + F('delivery_fee'))
+
+
+def encode_cursor(order) -> str:
+    return '%s_%d' % (order.created_at.isoformat(), order.pk)
+
+
+def decode_cursor(cursor):
+    """
+    Returns the (created_at, id) position encoded in a cursor, or None if
+    the cursor is malformed.
+    """
+    try:
+        created_at, pk = cursor.rsplit('_', 1)
+        created_at = datetime.fromisoformat(created_at)
+        pk = int(pk)
+    except (AttributeError, ValueError):
+        return None
+    # Cursors are only ever encoded from aware datetimes.
+    if timezone.is_naive(created_at):
+        return None
+    return created_at, pk
+
+
+def _history_page(orders, position):
+    orders = with_totals(orders).order_by('-created_at', '-id')
+    if position is not None:
+        created_at, pk = position
+        orders = orders.filter(Q(created_at__lt=created_at) |
+                               Q(created_at=created_at, pk__lt=pk))
+    return list(orders[:ORDERS_PER_PAGE + 1])
+
+
+def order_history_page(user, cursor=None):
+    """
+    Fetches one page of a customer's live and archived orders, newest
+    first, using their (placed_by, created_at, id) indexes. Returns the
+    orders and the cursor of the next page, if there is one.
+    """
+    position = decode_cursor(cursor)
+    orders = _history_page(Order.objects.filter(placed_by=user), position) + \
+        _history_page(ArchivedOrder.objects.filter(placed_by=user), position)
+    # Archived orders keep their ids, so the merged order is stable.
+    orders.sort(key=lambda order: (order.created_at, order.pk), reverse=True)
+
+    orders = orders[:ORDERS_PER_PAGE + 1]
+    next_cursor = None
+    if len(orders) > ORDERS_PER_PAGE:
+        orders = orders[:ORDERS_PER_PAGE]
+        next_cursor = encode_cursor(orders[-1])
+    return orders, next_cursor
+
+
+def customer_orders(user, archived=False):
+    """
+    Returns a customer's live (or archived) orders with their line items
+    and products.
+    """
+    order_model, item_model = (ArchivedOrder, ArchivedOrderItem) if archived \
+        else (Order, OrderItem)
+    return order_model.objects.filter(placed_by=user).prefetch_related(
+        Prefetch('orderitem_set',
+                 queryset=item_model.objects.select_related('product')
+                                            .defer('product__body',
+                                                   'product__body_html')))
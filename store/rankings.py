@@ -0,0 +1,103 @@
+"""
+Precomputed "top" and "recent" product rankings.
+
+Sales volume is accumulated incrementally into ProductSales from order
+items added since the last run, then the top few products of each kind
+are written to ProductRanking so listings read pre-sorted rows.
+
+Rankings are refreshed by the refresh_product_rankings command, on every
+release and periodically from a scheduler (e.g. Heroku Scheduler). Reads
+still skip products disabled or sold out since the last refresh, and
+fall back to a live query while a ranking is empty.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Sum
+
+from .models import Inventory, OrderItem, Product, ProductRanking, \
+    ProductSales, Watermark
+
+# Number of ranked products kept per kind.
+RANKING_SIZE = 20
+
+SALES_WATERMARK = 'product_sales'
+
+
+def refresh_product_sales() -> int:
+    """
+    Adds the quantities of order items placed since the last run to the
+    per-product sales counters. Returns the number of order items counted.
+    """
+    with transaction.atomic():
+        watermark, _ = Watermark.objects.select_for_update() \
+                                        .get_or_create(name=SALES_WATERMARK)
+        new_items = OrderItem.objects.filter(pk__gt=watermark.value)
+        last_pk = new_items.aggregate(last_pk=Max('pk'))['last_pk']
+        if last_pk is None:
+            return 0
+        new_items = new_items.filter(pk__lte=last_pk)
+
+        units_by_product = dict(new_items.filter(product__isnull=False)
+                                         .values_list('product')
+                                         .annotate(units=Sum('quantity'))
+                                         .order_by())
+        counters = ProductSales.objects.in_bulk(units_by_product.keys())
+        for product_id, units in units_by_product.items():
+            if product_id in counters:
+                counters[product_id].units_sold += units
+        ProductSales.objects.bulk_update(counters.values(), ['units_sold'])
+        ProductSales.objects.bulk_create([
+            ProductSales(product_id=product_id, units_sold=units)
+            for product_id, units in units_by_product.items()
+            if product_id not in counters])
+
+        num_items = new_items.count()
+        watermark.value = last_pk
+        watermark.save()
+    return num_items
+
+
+def refresh_product_rankings() -> None:
+    """
+    Rewrites the top-selling and most recently added rankings from the
+    enabled, in-stock products.
+    """
+    available = Product.objects.filter(is_enabled=True) \
+                               .annotate(total_inv=Sum('inventory__units_in_stock')) \
+                               .filter(total_inv__gt=0)
+    recent = list(available.order_by('-created_at', 'pk')
+                           .values_list('pk', flat=True)[:RANKING_SIZE])
+    top = list(available.filter(productsales__units_sold__gt=0)
+                        .order_by('-productsales__units_sold', 'pk')
+                        .values_list('pk', flat=True)[:RANKING_SIZE])
+    # Until enough products have sold, fill the top list with new arrivals.
+    top += [pk for pk in recent if pk not in top][:RANKING_SIZE - len(top)]
+
+    with transaction.atomic():
+        ProductRanking.objects.all().delete()
+        ProductRanking.objects.bulk_create(
+            [ProductRanking(kind=ProductRanking.TOP, rank=rank, product_id=pk)
+             for rank, pk in enumerate(top)] +
+            [ProductRanking(kind=ProductRanking.RECENT, rank=rank, product_id=pk)
+             for rank, pk in enumerate(recent)])
+
+
+def ranked_products(kind, limit):
+    """
+    Fetches the first enabled, in-stock products of a ranking, in rank
+    order, or ranks them live if the ranking has none.
+    """
+    in_stock = Inventory.objects.filter(product=OuterRef('pk'),
+                                        units_in_stock__gt=0)
+    available = Product.objects.filter(Exists(in_stock), is_enabled=True) \
+                               .defer('body', 'body_html') \
+                               .prefetch_related('productimage_set') \
+                               .annotate(num_images=Count('productimage'))
+    ranked = list(available.filter(productranking__kind=kind)
+                           .order_by('productranking__rank')[:limit])
+    if ranked:
+        return ranked
+    ordering = ['-created_at', 'pk']
+    if kind == ProductRanking.TOP:
+        ordering.insert(0, F('productsales__units_sold').desc(nulls_last=True))
+    return list(available.order_by(*ordering)[:limit])
@@ -0,0 +1,116 @@
+"""
+Related products based on co-purchases.
+
+Pairs of products bought in the same order are counted offline, in
+batches of orders, and the best neighbors of every product are stored in
+RelatedProduct. Products without enough co-purchase data are padded with
+other products from their category.
+"""
+
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+
+from .models import Inventory, Order, OrderItem, Product, RelatedProduct
+
+# Number of related products stored per product.
+RELATED_PRODUCTS_SIZE = 8
+
+
+def count_copurchases(batch_size=1000) -> Counter:
+    """
+    Counts, for every ordered pair of products, the number of orders
+    containing both. The pairs are grouped and counted by the database
+    one batch of orders at a time.
+    """
+    counts = Counter()
+    last_pk = 0
+    while True:
+        order_pks = list(Order.objects.filter(pk__gt=last_pk)
+                                      .order_by('pk')
+                                      .values_list('pk', flat=True)[:batch_size])
+        if not order_pks:
+            break
+        pairs = OrderItem.objects.filter(order__gte=order_pks[0],
+                                         order__lte=order_pks[-1],
+                                         product__isnull=False) \
+                                 .annotate(other=F('order__orderitem__product')) \
+                                 .filter(~Q(other=F('product')), other__isnull=False) \
+                                 .values_list('product', 'other') \
+                                 .annotate(orders=Count('order', distinct=True)) \
+                                 .order_by()
+        for product_pk, other_pk, orders in pairs:
+            counts[product_pk, other_pk] += orders
+        last_pk = order_pks[-1]
+    return counts
+
+
+def build_related_products(batch_size=1000) -> int:
+    """
+    Rebuilds the related products of every enabled product.
+    Returns the number of stored rows.
+    """
+    available = Product.objects.filter(is_enabled=True) \
+                               .annotate(total_inv=Sum('inventory__units_in_stock')) \
+                               .filter(total_inv__gt=0) \
+                               .order_by('pk')
+    category_by_product = dict(available.values_list('pk', 'category'))
+    products_by_category = defaultdict(list)
+    for product_pk, category_pk in category_by_product.items():
+        products_by_category[category_pk].append(product_pk)
+
+    neighbors = defaultdict(list)
+    for (product_pk, other_pk), orders in count_copurchases(batch_size).items():
+        if other_pk in category_by_product:
+            neighbors[product_pk].append((orders, other_pk))
+
+    rows = []
+    for product_pk, category_pk in category_by_product.items():
+        best = heapq.nlargest(RELATED_PRODUCTS_SIZE, neighbors[product_pk])
+        related = [(other_pk, orders) for orders, other_pk in best]
+        # Fall back to the product's category when data is sparse.
+        chosen = {product_pk} | {other_pk for other_pk, _ in related}
+        for other_pk in products_by_category[category_pk]:
+            if len(related) >= RELATED_PRODUCTS_SIZE:
+                break
+            if other_pk not in chosen:
+                related.append((other_pk, 0))
+        rows += [RelatedProduct(product_id=product_pk, related_id=other_pk,
+                                rank=rank, times_bought_together=orders)
+                 for rank, (other_pk, orders) in enumerate(related)]
+
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        RelatedProduct.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def related_products(product, limit):
+    """
+    Fetches the enabled, in-stock related products of a product, best
+    first.
+    """
+    # Products disabled or sold out since the last build are skipped.
+    in_stock = Inventory.objects.filter(product=OuterRef('pk'),
+                                        units_in_stock__gt=0)
+    related = Product.objects.filter(Exists(in_stock),
+                                     related_from__product=product,
+                                     is_enabled=True) \
+                             .defer('body', 'body_html') \
+                             .prefetch_related('productimage_set') \
+                             .annotate(num_images=Count('productimage')) \
+                             .order_by('related_from__rank')[:limit]
+    related = list(related)
+    if related:
+        return related
+
+    # Not indexed yet (e.g. added since the last build): same category.
+    return list(Product.objects.filter(~Q(pk=product.pk) & Q(category=product.category)
+                                       & Q(is_enabled=True))
+                               .defer('body', 'body_html')
+                               .prefetch_related('productimage_set')
+                               .annotate(num_images=Count('productimage', distinct=True),
+                                         total_inv=Sum('inventory__units_in_stock'))
+                               .filter(total_inv__gt=0)[:limit])
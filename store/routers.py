@@ -0,0 +1,101 @@
+"""
+Routing of catalog reads to read replicas.
+
+Everything reads from and writes to the primary ("default") database,
+except inside views marked with the replica_reads decorator, whose reads
+go to a replica from settings.DATABASE_REPLICAS. Each request picks one
+replica at random and reads all its data from it, so a page never mixes
+rows from replicas at different replication lag. Once a request
+writes, it reads from the primary for the rest of the request, and
+ReplicaPinningMiddleware keeps the client on the primary for
+settings.REPLICA_PIN_SECONDS afterwards so it sees its own writes.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Cookie marking clients that recently wrote.
+PIN_COOKIE_NAME = 'pin_primary'
+
+
+class RequestRouting:
+    """
+    Routing state of the current request.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica_reads = False
+        self.wrote = False
+        self._replica = None
+
+    @property
+    def reads_from_replicas(self) -> bool:
+        return self.replica_reads and not self.pinned and not self.wrote
+
+    @property
+    def replica(self) -> str:
+        # Chosen on the first replica read, then kept for the request.
+        if self._replica is None:
+            self._replica = random.choice(settings.DATABASE_REPLICAS)
+        return self._replica
+
+
+_routing = ContextVar('store_request_routing', default=None)
+
+
+@contextmanager
+def request_routing(pinned=False):
+    """
+    Tracks the routing state of one request.
+    """
+    state = RequestRouting(pinned)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Lets reads of the current request go to replicas, unless the client is
+    pinned to the primary or the request has written.
+    """
+    state = _routing.get()
+    if state is None:
+        yield
+        return
+    previous = state.replica_reads
+    state.replica_reads = True
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if settings.DATABASE_REPLICAS and state is not None \
+                and state.reads_from_replicas:
+            return state.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
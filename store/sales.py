@@ -0,0 +1,237 @@
+"""
+Daily sales rollups for the admin analytics dashboard.
+
+Orders are summarized per day and status into DailySales, and per day,
+status and product (or category) into DailyProductSales and
+DailyCategorySales. Each refresh finds the orders changed since the last
+run, through Order.updated_at, and recomputes the days they were placed
+on from scratch, live and archived orders alike, so status changes and
+edits move totals correctly. Days are selected by created_at ranges, so
+a refresh reads only the orders of the days it recomputes.
+
+Deleted orders leave no updated_at behind: the admin recomputes their
+days as it deletes them, and orders deleted any other way need a run
+with --rebuild. (Archiving moves orders without changing the totals.)
+The dashboard reads the rollups only.
+"""
+
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, DailyCategorySales, \
+    DailyProductSales, DailySales, Order, OrderItem, Watermark
+
+ROLLUPS_WATERMARK = 'sales_rollups'
+
+# Orders updated within this window before a run are picked up again by
+# the next one, in case their transactions had not committed yet.
+SAFETY_LAG = datetime.timedelta(minutes=1)
+
+# Statuses of orders that never turned into sales.
+LOST_STATUSES = ['DE', 'CN']
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def to_watermark(moment) -> int:
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+
+
+def from_watermark(value) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=value)
+
+
+def _line_total():
+    return ExpressionWrapper(F('unit_price') * F('quantity'),
+                             output_field=DecimalField(max_digits=12,
+                                                       decimal_places=2))
+
+
+def placed_on(dates, field='created_at') -> Q:
+    """
+    Matches rows whose datetime field falls on one of the given local
+    days, with one half-open range per run of consecutive days, so
+    indexes on the field apply.
+    """
+    condition = Q()
+    one_day = datetime.timedelta(days=1)
+    dates = sorted(set(dates))
+    while dates:
+        first = last = dates.pop(0)
+        while dates and dates[0] == last + one_day:
+            last = dates.pop(0)
+        start, end = (timezone.make_aware(datetime.datetime.combine(
+            day, datetime.time.min)) for day in (first, last + one_day))
+        condition |= Q(**{field + '__gte': start, field + '__lt': end})
+    return condition
+
+
+def order_dates(orders) -> set:
+    """
+    Returns the local days the given orders were placed on.
+    """
+    return set(orders.annotate(date=TruncDate('created_at'))
+                     .values_list('date', flat=True)
+                     .distinct().order_by())
+
+
+def _add(rollups, key, model, row):
+    rollup = rollups.get(key)
+    if rollup is None:
+        rollups[key] = model(**row)
+        return
+    for field, value in row.items():
+        if field not in ('date', 'status', 'product_id', 'category_id'):
+            setattr(rollup, field, getattr(rollup, field) + value)
+
+
+def rollup_days(dates) -> None:
+    """
+    Recomputes the rollups of the given days from their live and archived
+    orders.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    daily, by_product, by_category = {}, {}, {}
+    for order_model, item_model in ((Order, OrderItem),
+                                    (ArchivedOrder, ArchivedOrderItem)):
+        orders = order_model.objects.filter(placed_on(dates)) \
+                                    .annotate(date=TruncDate('created_at'))
+        items = item_model.objects.filter(placed_on(dates, 'order__created_at')) \
+                                  .annotate(date=TruncDate('order__created_at'),
+                                            status=F('order__status'),
+                                            line_total=_line_total())
+
+        for row in orders.values('date', 'status') \
+                         .annotate(orders=Count('pk'),
+                                   delivery_fees=Sum('delivery_fee')) \
+                         .order_by():
+            _add(daily, (row['date'], row['status']), DailySales, row)
+        for row in items.values('date', 'status') \
+                        .annotate(units=Sum('quantity'),
+                                  revenue=Sum('line_total')) \
+                        .order_by():
+            _add(daily, (row['date'], row['status']), DailySales, row)
+        for row in items.values('date', 'status', 'product') \
+                        .annotate(orders=Count('order', distinct=True),
+                                  units=Sum('quantity'),
+                                  revenue=Sum('line_total')) \
+                        .order_by():
+            row['product_id'] = row.pop('product')
+            _add(by_product, (row['date'], row['status'], row['product_id']),
+                 DailyProductSales, row)
+        for row in items.values('date', 'status',
+                                category=F('product__category')) \
+                        .annotate(orders=Count('order', distinct=True),
+                                  units=Sum('quantity'),
+                                  revenue=Sum('line_total')) \
+                        .order_by():
+            row['category_id'] = row.pop('category')
+            _add(by_category, (row['date'], row['status'], row['category_id']),
+                 DailyCategorySales, row)
+
+    with transaction.atomic():
+        for model in (DailySales, DailyProductSales, DailyCategorySales):
+            model.objects.filter(date__in=dates).delete()
+        DailySales.objects.bulk_create(daily.values())
+        DailyProductSales.objects.bulk_create(by_product.values(),
+                                              batch_size=1000)
+        DailyCategorySales.objects.bulk_create(by_category.values(),
+                                               batch_size=1000)
+
+
+def refresh_sales_rollups(rebuild=False) -> int:
+    """
+    Recomputes the days with orders placed or updated since the last run,
+    or every day if rebuilding. Returns the number of recomputed days.
+    """
+    with transaction.atomic():
+        watermark, _ = Watermark.objects.select_for_update() \
+                                        .get_or_create(name=ROLLUPS_WATERMARK)
+        until = timezone.now() - SAFETY_LAG
+        changed = Order.objects.filter(updated_at__lte=until)
+        if rebuild:
+            for model in (DailySales, DailyProductSales, DailyCategorySales):
+                model.objects.all().delete()
+        else:
+            changed = changed.filter(updated_at__gt=from_watermark(watermark.value))
+        dates = order_dates(changed)
+        if rebuild:
+            dates.update(order_dates(ArchivedOrder.objects.all()))
+        rollup_days(dates)
+        watermark.value = to_watermark(until)
+        watermark.save()
+    return len(dates)
+
+
+def sales_dashboard(months=12, today=None):
+    """
+    Summarizes the rollups of the last few months, including the current
+    one: monthly sales, orders by status, and the best-selling products
+    and categories. Denied and cancelled orders are left out of sales.
+    """
+    today = today or timezone.localdate()
+    start = today.replace(day=1)
+    for _ in range(months - 1):
+        start = (start - datetime.timedelta(days=1)).replace(day=1)
+
+    daily = DailySales.objects.filter(date__gte=start)
+    sold = daily.exclude(status__in=LOST_STATUSES)
+    monthly = {row['month']: row for row in
+               sold.annotate(month=TruncMonth('date'))
+                   .values('month')
+                   .annotate(orders=Sum('orders'), units=Sum('units'),
+                             revenue=Sum('revenue'),
+                             delivery_fees=Sum('delivery_fees'))
+                   .order_by()}
+    month, months_list = start, []
+    while month <= today:
+        row = monthly.get(month, {})
+        months_list.append({'month': month,
+                            'orders': row.get('orders') or 0,
+                            'units': row.get('units') or 0,
+                            'revenue': row.get('revenue') or Decimal('0.00'),
+                            'delivery_fees': row.get('delivery_fees') or Decimal('0.00')})
+        month = (month + datetime.timedelta(days=31)).replace(day=1)
+    peak = max([row['revenue'] for row in months_list] + [Decimal('0.01')])
+    for row in months_list:
+        row['share'] = int(row['revenue'] * 100 / peak)
+
+    top_products = DailyProductSales.objects.filter(date__gte=start,
+                                                    product__isnull=False) \
+                                            .exclude(status__in=LOST_STATUSES) \
+                                            .values('product__title') \
+                                            .annotate(units=Sum('units'),
+                                                      revenue=Sum('revenue')) \
+                                            .order_by('-revenue')[:10]
+    top_categories = DailyCategorySales.objects.filter(date__gte=start) \
+                                               .exclude(status__in=LOST_STATUSES) \
+                                               .values('category__name') \
+                                               .annotate(units=Sum('units'),
+                                                         revenue=Sum('revenue')) \
+                                               .order_by('-revenue')[:10]
+    statuses = dict(Order._meta.get_field('status').choices)
+    by_status = [{**row, 'status': statuses.get(row['status'], row['status'])}
+                 for row in daily.values('status')
+                                 .annotate(orders=Sum('orders'),
+                                           revenue=Sum('revenue'))
+                                 .order_by('-orders')]
+    return {
+        'start': start,
+        'months': months_list,
+        'totals': {key: sum(row[key] for row in months_list)
+                   for key in ('orders', 'units', 'revenue', 'delivery_fees')},
+        'by_status': by_status,
+        'top_products': list(top_products),
+        'top_categories': list(top_categories),
+        'refreshed_at': Watermark.objects.filter(name=ROLLUPS_WATERMARK)
+                                         .values_list('updated_at', flat=True)
+                                         .first(),
+    }
@@ -0,0 +1,42 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cart import merge_session_cart
+from .catalog import bump_catalog_version
+from .models import Category, Inventory, Product, ProductImage
+from .stock import check_stock_levels
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=Inventory)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Inventory)
+def inventory_saved(sender, instance, **kwargs):
+    # Cached catalog data only depends on whether products are in stock,
+    # so saves that merely change the number of units (such as checkouts
+    # that leave stock) keep the cached fragments.
+    was_in_stock = getattr(instance, 'was_in_stock', None)
+    if was_in_stock is None or was_in_stock != instance.is_in_stock():
+        bump_catalog_version()
+    instance.was_in_stock = instance.is_in_stock()
+
+
+@receiver(post_save, sender=Inventory)
+def inventory_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        check_stock_levels(Inventory.objects.filter(pk=instance.pk))
+
+
+@receiver(user_logged_in)
+def customer_logged_in(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        merge_session_cart(request, user)
@@ -0,0 +1,33 @@
+/**
+ * Loads the per-visitor parts of the page (account links, mini-cart and
+ * the CSRF token) from the session fragment endpoint, so the rest of the
+ * page can be cached publicly.
+ */
+jQuery(function($){
+  var url = $('#session-fragment-script').data('url');
+
+  $.get(url, function(html){
+    var fragment = $('<div>').html(html);
+
+    // Keep the existing elements so event handlers bound to them survive.
+    $('#aa-account-nav').html(fragment.find('#aa-account-nav').html());
+    $('#aa-cartbox').html(fragment.find('#aa-cartbox').html());
+
+    var token = fragment.find('#aa-csrf-token').val();
+    $('input[name="csrfmiddlewaretoken"]').filter(function(){
+      return !this.value;
+    }).val(token);
+
+    // Default the quantity of a product form to the quantity in the cart.
+    $('form[data-stock-keeping-unit]').each(function(){
+      var sku = $(this).data('stock-keeping-unit');
+      var quantity = $(this).find('input[name="quantity"]');
+      var item = fragment.find('li[data-stock-keeping-unit]').filter(function(){
+        return $(this).data('stock-keeping-unit') === sku;
+      });
+      if (item.length && !quantity.val()) {
+        quantity.val(item.data('quantity'));
+      }
+    });
+  });
+});
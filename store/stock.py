@@ -0,0 +1,91 @@
+"""
+Low-stock alerts and reorder suggestions.
+
+Inventories are checked when they change, not by scanning: saving an
+inventory checks it through a signal, and set-based stock updates check
+the rows they touched. An inventory raises one StockAlert when it falls
+to its reorder level; the alert stays open, and no other is raised,
+until the inventory is restocked above that level.
+"""
+
+import datetime
+import logging
+import math
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Sum
+from django.utils import timezone
+
+from .models import Inventory, OrderItem, StockAlert
+
+logger = logging.getLogger(__name__)
+
+# Orders whose units never left the store.
+UNSOLD_STATUSES = ['CN', 'DE']
+
+
+@transaction.atomic
+def check_stock_levels(inventories) -> int:
+    """
+    Raises alerts for the given inventories that fell to their reorder
+    level and have no open alert, and resolves the open alerts of those
+    restocked above it. Returns the number of raised alerts.
+    """
+    open_alerts = StockAlert.objects.filter(resolved_at__isnull=True)
+    fallen = list(inventories.select_for_update(of=('self',))
+                             .filter(units_in_stock__lte=F('reorder_level'))
+                             .exclude(Exists(open_alerts.filter(inventory=OuterRef('pk'))))
+                             .select_related('location')
+                             .order_by('pk'))
+    StockAlert.objects.bulk_create([
+        StockAlert(inventory=inventory,
+                   units_in_stock=inventory.units_in_stock,
+                   reorder_level=inventory.reorder_level)
+        for inventory in fallen])
+    for inventory in fallen:
+        logger.warning('Low stock: %d units of %s left at %s.',
+                       inventory.units_in_stock, inventory.product_id,
+                       inventory.location.name)
+
+    open_alerts.filter(inventory__in=inventories.filter(
+        units_in_stock__gt=F('reorder_level')).values('pk')) \
+               .update(resolved_at=timezone.now())
+    return len(fallen)
+
+
+def reorder_report(days=30, lead_time_days=7, cover_days=14):
+    """
+    Estimates, from the units sold in the last few days, how long the
+    stock of each inventory lasts and how many units to reorder so it
+    covers the lead time plus some days. Returns the inventories that
+    are low or run out within the lead time, soonest first.
+    """
+    since = timezone.now() - datetime.timedelta(days=days)
+    units_sold = {(row['product'], row['location']): row['units'] for row in
+                  OrderItem.objects.filter(order__created_at__gte=since,
+                                           product__isnull=False,
+                                           location__isnull=False)
+                                   .exclude(order__status__in=UNSOLD_STATUSES)
+                                   .values('product', 'location')
+                                   .annotate(units=Sum('quantity'))
+                                   .order_by()}
+    rows = []
+    for inventory in Inventory.objects.select_related('location') \
+                                      .order_by('product', 'location__name'):
+        velocity = units_sold.get((inventory.product_id,
+                                   inventory.location_id), 0) / days
+        days_left = inventory.units_in_stock / velocity if velocity else None
+        is_low = inventory.units_in_stock <= inventory.reorder_level
+        if not is_low and (days_left is None or days_left > lead_time_days):
+            continue
+        target = math.ceil(velocity * (lead_time_days + cover_days))
+        rows.append({
+            'inventory': inventory,
+            'units_per_day': velocity,
+            'days_left': days_left,
+            'reorder_units': max(target, inventory.reorder_level + 1)
+                             - inventory.units_in_stock,
+        })
+    rows.sort(key=lambda row: (row['days_left'] is not None,
+                               row['days_left'] or 0))
+    return rows
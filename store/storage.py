@@ -0,0 +1,50 @@
+"""
+Media storages that remember the URLs they build.
+
+Listings ask the storage for the URL of every image they show, and
+building one can cost more than the rest of a product card (Cloudinary
+signs and formats each URL). Stored names never change meaning, since
+replacing a file stores it under a new name, so each process keeps the
+URLs it built keyed by name, and drops a name when its file is replaced
+or deleted.
+"""
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+class CachedURLMixin:
+    """
+    Caches url() per file name in a bounded, per-process dictionary.
+    """
+    url_cache_size = settings.MEDIA_URL_CACHE_SIZE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._urls = {}
+
+    def url(self, name):
+        try:
+            return self._urls[name]
+        except KeyError:
+            pass
+        url = super().url(name)
+        if len(self._urls) >= self.url_cache_size:
+            self._urls.clear()
+        self._urls[name] = url
+        return url
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        self._urls.pop(name, None)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self._urls.pop(name, None)
+
+
+class LocalMediaStorage(CachedURLMixin, FileSystemStorage):
+    """
+    Stores media under MEDIA_ROOT, for development, tests and offline use.
+    """
@@ -0,0 +1,54 @@
+"""
+Derived text of rich product bodies.
+
+Product bodies are summernote HTML entered by staff. They are sanitized
+for the product page and reduced to a short plain-text excerpt for
+listings once, when the product is saved.
+"""
+
+import html
+import re
+
+import bleach
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+ALLOWED_TAGS = frozenset([
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span',
+    'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead',
+    'tr', 'u', 'ul',
+])
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title', 'target'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan'],
+}
+
+# Elements whose content is dropped along with their tags.
+DROPPED_ELEMENTS_RE = re.compile(r'<(script|style)\b.*?</\1\s*>',
+                                 re.IGNORECASE | re.DOTALL)
+
+# Maximum length of listing excerpts, in characters.
+EXCERPT_LENGTH = 160
+
+
+def sanitize_html(body) -> str:
+    """
+    Removes scripts, event handlers and any other markup not needed to
+    display a product body.
+    """
+    body = DROPPED_ELEMENTS_RE.sub('', body)
+    return bleach.clean(body, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+                        strip=True, strip_comments=True)
+
+
+def plain_text_excerpt(body, length=EXCERPT_LENGTH) -> str:
+    """
+    Reduces an HTML body to a single line of plain text of at most
+    length characters.
+    """
+    text = html.unescape(strip_tags(body))
+    text = re.sub(r'\s+', ' ', text).strip()
+    return Truncator(text).chars(length)
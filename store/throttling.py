@@ -0,0 +1,95 @@
+"""
+Request throttling with sliding-window counters in the cache.
+
+Each scope has a budget in settings.THROTTLE_RATES, such as '30/m'. A
+client's requests are counted per fixed window in the cache, and the
+count of the previous window is weighted by how much of it still
+overlaps the sliding window. Over budget, the view is not called and a
+plain 429 response is returned, before any database work.
+"""
+
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parses a '<requests>/<period>' rate into (requests, seconds).
+    """
+    num_requests, period = rate.split('/')
+    return int(num_requests), PERIODS[period[0]]
+
+
+def client_ip(request) -> str:
+    # Behind THROTTLE_PROXY_COUNT proxies, the client address is the one
+    # the outermost proxy appended to X-Forwarded-For. Requests that did
+    # not come through the proxies fall back to REMOTE_ADDR.
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if settings.THROTTLE_PROXY_COUNT > 0 and forwarded_for:
+        addresses = forwarded_for.split(',')
+        if len(addresses) >= settings.THROTTLE_PROXY_COUNT:
+            return addresses[-settings.THROTTLE_PROXY_COUNT].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hit(scope, ident, rate, now=None):
+    """
+    Counts a request of a client against a rate. Returns None if it is
+    within budget, or the seconds to wait before retrying (the request is
+    then not counted).
+    """
+    num_requests, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current_key = 'throttle:%s:%s:%d' % (scope, ident, window)
+    previous_key = 'throttle:%s:%s:%d' % (scope, ident, window - 1)
+
+    cache = caches[settings.THROTTLE_CACHE]
+    counts = cache.get_many([current_key, previous_key])
+    count = counts.get(previous_key, 0) * (1 - elapsed / period) \
+        + counts.get(current_key, 0)
+    if count >= num_requests:
+        return max(1, math.ceil(period - elapsed))
+    if current_key in counts:
+        try:
+            cache.incr(current_key)
+            return None
+        except ValueError:  # Expired since it was read.
+            pass
+    if not cache.add(current_key, 1, timeout=2 * period):
+        cache.incr(current_key)
+    return None
+
+
+def throttle(scope, by_user=False, when=None):
+    """
+    Limits requests to a view to the rate of a scope in
+    settings.THROTTLE_RATES, per client IP, or per customer if by_user is
+    set (which reads the session, so not for publicly cached pages).
+    when(request), if given, decides which requests count.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.THROTTLE_RATES.get(scope)
+            if rate is not None and (when is None or when(request)):
+                if by_user and request.user.is_authenticated:
+                    ident = 'user-%d' % request.user.pk
+                else:
+                    ident = client_ip(request)
+                retry_after = hit(scope, ident, rate)
+                if retry_after is not None:
+                    response = HttpResponse('Too many requests.', status=429,
+                                            content_type='text/plain')
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
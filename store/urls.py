@@ -20,7 +20,11 @@ urlpatterns = [
          views.add_to_wishlist, name='add_to_wishlist'),
     path('remove-from-wishlist/<slug:stock_keeping_unit>/',
          views.remove_from_wishlist, name='remove_from_wishlist'),
+    path('orders/', views.order_history, name='order_history'),
+    path('orders/<int:order_id>/', views.order_detail, name='order_detail'),
     path('checkout/', views.checkout, name='checkout'),
+    path('session-fragment/', views.session_fragment,
+         name='session_fragment'),
     path('checkout-done/', views.checkout_done, name='checkout_done'),
 
     # Authentication
@@ -1,47 +1,57 @@
 from django.conf import settings
 from django.http import HttpResponseRedirect
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import never_cache
 
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Sum
 
-from .models import Product, Category, OrderItem, WishlistItem
-from .forms import CartAddForm, CheckoutForm, RegistrationForm, \
-    PersonalDetailsChangeForm
+from .models import Product, Category, OrderItem, ProductRanking, \
+    WishlistItem
+from .cart import cart_context, clear_cart, get_cart, save_cart
+from .decorators import public_cache, replica_reads
+from .facets import catalog_facets
+from .orders import customer_orders, order_history_page
+from .rankings import ranked_products
+from .recommendations import related_products
+from .throttling import throttle
+from .forms import CartAddForm, CheckoutForm, ProductFilterForm, \
+    RegistrationForm, PersonalDetailsChangeForm
 
 
+@public_cache
+@replica_reads
 def index(request):
     """
     Food store home page.
     """
-    top_product_list = Product.objects.filter(is_enabled=True) \
-                                      .prefetch_related('productimage_set', 'inventory_set') \
-                                      .annotate(num_images=Count('productimage'),
-                                                total_inv=Sum('inventory__units_in_stock')) \
-                                      .filter(total_inv__gt=0)[:5]
+    top_product_list = ranked_products(ProductRanking.TOP, 5)
     context = {'top_product_list': top_product_list}
     return render(request, 'store/index.html', context)
 
 
+@public_cache
+@throttle('search', when=lambda request: bool(request.GET.get('search')))
+@replica_reads
 def products(request, category__slug=None):
     """
-    Products listing. Filters by category.
+    Products listing. Filters by category, title, price range and stock.
     If no category is given, all products will be listed.
     """
-    # Fetch categories
-    category_list = Category.objects.all()
+    # Fetch categories with product counts (cached per catalog version)
+    facets = catalog_facets()
     # Fetch products
     product_list = Product.objects.filter(is_enabled=True) \
+                                  .defer('body', 'body_html') \
                                   .prefetch_related('productimage_set', 'inventory_set') \
                                   .annotate(num_images=Count('productimage'),
-                                            total_inv=Sum('inventory__units_in_stock')) \
-                                  .filter(total_inv__gt=0)
-    # TODO: Dummy top rated and recently added products
-    top_product_list = product_list[:3]
-    recent_product_list = product_list.order_by('-stock_keeping_unit')[:3]
+                                            total_inv=Sum('inventory__units_in_stock'))
+    # Precomputed top selling and recently added products
+    top_product_list = ranked_products(ProductRanking.TOP, 3)
+    recent_product_list = ranked_products(ProductRanking.RECENT, 3)
     # Selected category
     selected_category = None
 
@@ -49,15 +59,24 @@ def products(request, category__slug=None):
         selected_category = Category.objects.get(slug=category__slug)
         product_list = product_list.filter(category=selected_category)
 
-    else:
-        try:
-            product_list = product_list.filter(
-                title__icontains=request.GET['search'])
-        except KeyError:
-            pass
+    filter_form = ProductFilterForm(request.GET)
+    # Invalid fields are left out of cleaned_data; the valid ones still
+    # apply, so e.g. a mistyped price keeps the search term.
+    filter_form.is_valid()
+    filters = filter_form.cleaned_data
+    if filters.get('search'):
+        product_list = product_list.filter(title__icontains=filters['search'])
+    if filters.get('min_price') is not None:
+        product_list = product_list.filter(unit_price__gte=filters['min_price'])
+    if filters.get('max_price') is not None:
+        product_list = product_list.filter(unit_price__lte=filters['max_price'])
+    if not filters.get('include_out_of_stock'):
+        product_list = product_list.filter(total_inv__gt=0)
 
     context = {
-        'category_list': category_list,
+        'category_facets': facets['categories'],
+        'price_histogram': facets['price_histogram'],
+        'filter_form': filter_form,
         'selected_category': selected_category,
         'product_list': product_list,
         'top_product_list': top_product_list,
@@ -66,42 +85,38 @@ def products(request, category__slug=None):
     return render(request, 'store/products.html', context)
 
 
+@public_cache
+@throttle('product')
+@replica_reads
 def add_to_cart(request, stock_keeping_unit):
     """
     Endpoint for adding a product to cart.
     """
     # Fetch product
     product = Product.objects.select_related('category') \
+                             .defer('body') \
                              .prefetch_related('inventory_set',
                                                'productimage_set') \
                              .annotate(num_images=Count('productimage')) \
                              .get(stock_keeping_unit=stock_keeping_unit)
-    related_product_list = Product.objects.filter(~Q(stock_keeping_unit=stock_keeping_unit) &
-                                                  Q(category=product.category)) \
-                                          .prefetch_related('productimage_set', 'inventory_set') \
-                                          .annotate(num_images=Count('productimage'),
-                                                    total_inv=Sum('inventory__units_in_stock')) \
-                                          .filter(total_inv__gt=0)[:4]
+    related_product_list = related_products(product, 4)
 
     if request.method == 'POST':
         add_to_cart_form = CartAddForm(request.POST, product=product)
         if add_to_cart_form.is_valid():
             # add item to cart in session
-            cart = request.session['cart']
+            cart = get_cart(request)
             cart[stock_keeping_unit] = \
                 add_to_cart_form.cleaned_data['quantity']
-            request.session['cart'] = cart
+            save_cart(request, cart)
 
             # redirect back to store in product's category
             return HttpResponseRedirect(reverse('store:products'))
 
     else:
-        # If the item is already in cart, use its current quantity.
-        try:
-            add_to_cart_form = CartAddForm({
-                'quantity': request.session['cart'][stock_keeping_unit]})
-        except KeyError:
-            add_to_cart_form = CartAddForm()
+        # The page is shared by all visitors. The quantity already in the
+        # cart is filled in client-side from the session fragment.
+        add_to_cart_form = CartAddForm()
 
     context = {'product': product,
                'add_to_cart_form': add_to_cart_form,
@@ -109,13 +124,14 @@ def add_to_cart(request, stock_keeping_unit):
     return render(request, 'store/product.html', context)
 
 
+@throttle('cart')
 def remove_from_cart(request, stock_keeping_unit):
     """
     Endpoint for removing an item from the cart.
     """
-    cart = request.session['cart']
-    del cart[stock_keeping_unit]
-    request.session['cart'] = cart
+    cart = get_cart(request)
+    cart.pop(stock_keeping_unit, None)
+    save_cart(request, cart)
     return HttpResponseRedirect(reverse('store:view_cart'))
 
 
@@ -123,12 +139,21 @@ def view_cart(request):
     """
     Customer's cart view.
     """
-    # Just render the page. The context processor for cart
-    # will place everything in the context.
-    return render(request, 'store/cart.html', {})
+    return render(request, 'store/cart.html', cart_context(request))
+
+
+@never_cache
+def session_fragment(request):
+    """
+    Per-visitor parts of every page: account links, the mini-cart and a
+    CSRF token for forms on publicly cached pages. Loaded client-side.
+    """
+    return render(request, 'store/session_fragment.html',
+                  cart_context(request))
 
 
 @login_required
+@replica_reads
 def wishlist(request):
     """
     Customer's wishlist view.
@@ -139,6 +164,7 @@ def wishlist(request):
 
 
 @login_required
+@throttle('wishlist', by_user=True)
 def add_to_wishlist(request, stock_keeping_unit):
     """
     Endpoint for adding an item to the user's wishlist.
@@ -151,6 +177,7 @@ def add_to_wishlist(request, stock_keeping_unit):
 
 
 @login_required
+@throttle('wishlist', by_user=True)
 def remove_from_wishlist(request, stock_keeping_unit):
     """
     Endpoint for removing an item from the user's wishlist.
@@ -166,7 +193,7 @@ def checkout(request):
     """
     Endpoint for placing an order.
     """
-    cart = request.session['cart']
+    cart = get_cart(request)
 
     # If there are contents in cart, proceed to processing of checkout form
     if len(cart) > 0:
@@ -186,23 +213,24 @@ def checkout(request):
                 # 4 - The order items from the cart
                 for stock_keeping_unit, quantity in cart.items():
                     product = Product.objects.get(pk=stock_keeping_unit)
+                    available_inventory = product.inventory_set.filter(units_in_stock__gt=0)[0]
                     order_item = OrderItem(order=order,
                                            product=product,
                                            unit_price=product.unit_price,
-                                           quantity=quantity)
+                                           quantity=quantity,
+                                           location=available_inventory.location)
                     order_item.save()
                     # Deduct from product inventory
-                    available_inventory = product.inventory_set.filter(units_in_stock__gt=0)[0]
                     available_inventory.units_in_stock -= quantity
                     available_inventory.save()
-                del request.session['cart']
+                clear_cart(request)
 
                 return HttpResponseRedirect(reverse('store:checkout_done'))
 
         else:
             checkout_form = CheckoutForm()
 
-        context = {'checkout_form': checkout_form}
+        context = {'checkout_form': checkout_form, **cart_context(request)}
         return render(request, 'store/checkout.html', context)
 
     # If there are no contents in cart
@@ -216,6 +244,29 @@ def checkout_done(request):
     return render(request, 'store/checkout_done.html', {})
 
 
+@login_required
+def order_history(request):
+    """
+    Customer's past orders, newest first.
+    """
+    order_list, next_cursor = order_history_page(request.user,
+                                                 request.GET.get('before'))
+    context = {'order_list': order_list, 'next_cursor': next_cursor}
+    return render(request, 'store/order_history.html', context)
+
+
+@login_required
+def order_detail(request, order_id):
+    """
+    One of the customer's orders with its line items.
+    """
+    order = customer_orders(request.user).filter(pk=order_id).first() or \
+        get_object_or_404(customer_orders(request.user, archived=True),
+                          pk=order_id)
+    context = {'order': order}
+    return render(request, 'store/order_detail.html', context)
+
+
 def register(request):
     """
     Registration page.